@@ -21,7 +21,15 @@ setup(
     url="https://github.com/thiagopbueno/tuneconfig",
     packages=find_packages(),
     scripts=[],
+    entry_points={
+        "console_scripts": [
+            "tuneconfig-worker=tuneconfig.distributed:main",
+            "tuneconfig-plot=tuneconfig.plotter:main",
+        ],
+    },
+    python_requires=">=3.6",
     install_requires=["matplotlib", "numpy", "pandas", "tqdm",],
+    extras_require={"feather": ["pyarrow"]},
     include_package_data=True,
     zip_safe=False,
     classifiers=[
@@ -1,3 +1,4 @@
+import asyncio
 import os
 from collections import namedtuple
 import itertools
@@ -41,6 +42,34 @@ def exec_func(config):
     return (mp.current_process().pid, config, logdir, run_id)
 
 
+async def async_exec_func(config):
+    await asyncio.sleep(0.01)
+    return exec_func(config)
+
+
+def scheduled_exec_func(config):
+    logdir = config["logdir"]
+    budget = config["budget"]
+
+    score = config["learning_rate"] * config["batch_size"] * (1.0 - 1.0 / budget)
+
+    df = pd.DataFrame({"score": pd.Series([score] * budget)})
+    filepath = os.path.join(logdir, "data.csv")
+    df.to_csv(filepath, index=False)
+
+    return {"score": score, "budget": budget}
+
+
+def logged_exec_func(config):
+    score = config["learning_rate"] * config["batch_size"] * (1.0 - 1.0 / config["budget"])
+
+    with RunLogger(config["logdir"]) as logger:
+        for step in range(config["budget"]):
+            logger.log({"step": step, "score": score})
+
+    return {"score": score, "budget": config["budget"]}
+
+
 @pytest.fixture(scope="session")
 def config_factory():
     def format_fn(param):
@@ -1,7 +1,20 @@
+import os
 import pytest
+import shutil
+import sys
 
+import numpy as np
+import pandas as pd
+
+from tuneconfig.analysis import ExperimentAnalysis
+from tuneconfig.config_factory import ConfigFactory, grid_search
+from tuneconfig.experiment import Experiment
+from tuneconfig.logger import RunLogger
 from tuneconfig.trial import Trial
 
+sys.path.insert(0, os.path.abspath("tests"))
+import conftest
+
 
 def test_setup(analysis):
     trials = analysis._trials
@@ -21,3 +34,356 @@ def test_metrics(analysis):
 
 def test_info(analysis):
     analysis.info()
+
+
+def test_setup_without_manifest(analysis):
+    manifest = os.path.join(analysis.logdir, Experiment.MANIFEST_FILE)
+    backup = manifest + ".bak"
+    os.rename(manifest, backup)
+    try:
+        legacy = ExperimentAnalysis(analysis.logdir)
+        legacy.setup()
+    finally:
+        os.rename(backup, manifest)
+
+    assert set(legacy._trials) == set(analysis._trials)
+    assert legacy.params == analysis.params
+    for dirname, trial in analysis._trials.items():
+        assert trial.config == legacy._trials[dirname].config
+        assert sorted(trial.runs) == sorted(legacy._trials[dirname].runs)
+
+
+@pytest.fixture(scope="function")
+def snapshot_logdir(config_factory):
+    logdir = "/tmp/tuneconfig_snapshot"
+    experiment = Experiment(config_factory, logdir)
+    experiment.start()
+    experiment.run(conftest.exec_func, 2, 2)
+    yield logdir
+    shutil.rmtree(logdir)
+
+
+def test_setup_with_partial_manifest(snapshot_logdir):
+    # Trials of older experiments without a manifest are found given scan=True.
+    os.remove(os.path.join(snapshot_logdir, Experiment.MANIFEST_FILE))
+    experiment = Experiment(ConfigFactory({"lr": grid_search([0.5])}), snapshot_logdir)
+    experiment.start()
+    experiment.run(conftest.exec_func, 2, 2, executor="serial")
+
+    analysis = ExperimentAnalysis(snapshot_logdir)
+    analysis.setup(snapshot=False)
+    assert len(analysis) == 1
+
+    analysis.setup(snapshot=False, scan=True)
+    assert len(analysis) == 18 + 1
+    assert all(len(trial) == 2 for trial in analysis._trials.values())
+
+
+def test_setup_after_upgrade(snapshot_logdir, config_factory):
+    # Runs of trials written without a manifest are recorded once the trials are.
+    os.remove(os.path.join(snapshot_logdir, Experiment.MANIFEST_FILE))
+    experiment = Experiment(config_factory, snapshot_logdir)
+    experiment.start()
+    experiment.run(conftest.exec_func, 2, 2, executor="serial")
+
+    analysis = ExperimentAnalysis(snapshot_logdir)
+    analysis.setup(snapshot=False)
+    assert len(analysis) == 18
+    for dirname, trial in analysis._trials.items():
+        assert sorted(trial.runs) == [os.path.join(dirname, f"run{k}") for k in range(4)]
+
+
+def test_setup_with_deleted_run_dir(snapshot_logdir):
+    analysis = ExperimentAnalysis(snapshot_logdir)
+    analysis.setup(snapshot=False)
+    trial = analysis[0]
+    run_dir = sorted(trial.runs)[0]
+    shutil.rmtree(run_dir)
+
+    analysis = ExperimentAnalysis(snapshot_logdir)
+    analysis.setup(snapshot=False)
+    assert len(analysis) == 18
+    assert sorted(analysis._trials[trial.logdir].runs) == sorted(trial.runs)[1:]
+    assert not analysis.refresh()
+
+
+def test_setup_snapshot(snapshot_logdir, monkeypatch):
+    analysis = ExperimentAnalysis(snapshot_logdir)
+    analysis.setup()
+    assert os.path.exists(os.path.join(snapshot_logdir, ExperimentAnalysis.SNAPSHOT_FILE))
+
+    read_csv = pd.read_csv
+    filepaths = []
+
+    def counting_read_csv(filepath, *args, **kwargs):
+        filepaths.append(filepath)
+        return read_csv(filepath, *args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_csv", counting_read_csv)
+
+    reloaded = ExperimentAnalysis(snapshot_logdir)
+    reloaded.setup()
+    assert filepaths == []
+    assert set(reloaded._trials) == set(analysis._trials)
+    for dirname, trial in analysis._trials.items():
+        assert trial.config == reloaded._trials[dirname].config
+        for run_dir, results in trial.runs.items():
+            for result, df in results.items():
+                assert df.equals(reloaded._trials[dirname].runs[run_dir][result])
+
+    run_dir = sorted(analysis[0].runs)[0]
+    filepath = os.path.join(run_dir, "data.csv")
+    with open(filepath, "a") as file:
+        file.write("1.0,2.0,3.0\n")
+
+    filepaths.clear()
+    reloaded = ExperimentAnalysis(snapshot_logdir)
+    reloaded.setup()
+    assert filepaths == []
+    dirname = analysis[0].logdir
+    assert len(reloaded._trials[dirname].runs[run_dir]["data"]) == 11
+    assert len(filepaths) == 1
+
+
+def test_setup_without_snapshot(snapshot_logdir):
+    analysis = ExperimentAnalysis(snapshot_logdir)
+    analysis.setup(snapshot=False)
+    assert not os.path.exists(os.path.join(snapshot_logdir, ExperimentAnalysis.SNAPSHOT_FILE))
+    assert len(analysis) == 18
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_setup_with_workers(snapshot_logdir, executor, monkeypatch):
+    analysis = ExperimentAnalysis(snapshot_logdir)
+    analysis.setup(snapshot=False, num_workers=2, executor=executor)
+
+    def failing_read_csv(*args, **kwargs):
+        raise AssertionError("result files should be loaded")
+
+    monkeypatch.setattr(pd, "read_csv", failing_read_csv)
+
+    for trial in analysis._trials.values():
+        for results in trial.runs.values():
+            assert all(results.file(result).is_loaded for result in results)
+            assert len(results["data"]) == 10
+            assert list(results["data"].columns) == ["foo", "baz", "bar"]
+
+
+def test_get(analysis):
+    trials = analysis.get(["learning_rate=0.1", "optimizer=Adam"])
+    assert len(trials) == 3
+    assert all(trial.config["learning_rate"] == 0.1 for trial in trials.values())
+    assert all(trial.config["optimizer"] == "Adam" for trial in trials.values())
+
+    assert analysis.get(["learning_rate=0."]) == {}
+    assert len(analysis.get([])) == len(analysis)
+
+
+def test_select(analysis):
+    trials = analysis.select(learning_rate=0.1, batch_size=[32, 64])
+    assert len(trials) == 6
+    for trial in trials.values():
+        assert trial.config["learning_rate"] == 0.1
+        assert trial.config["batch_size"] in [32, 64]
+
+    assert trials == {
+        **analysis.get(["learning_rate=0.1", "batch_size=32"]),
+        **analysis.get(["learning_rate=0.1", "batch_size=64"]),
+    }
+
+    assert analysis.select(learning_rate=0.5) == {}
+    assert len(analysis.select()) == len(analysis)
+
+    with pytest.raises(ValueError):
+        analysis.select(momentum=0.9)
+
+
+def test_getitem(analysis):
+    trials = list(analysis._trials.values())
+    assert all(analysis[i] is trial for i, trial in enumerate(trials))
+    assert analysis[-1] is trials[-1]
+
+
+def test_to_frame(analysis):
+    df = analysis.to_frame()
+    params = sorted(analysis.params)
+    assert list(df.columns) == params + ["run", "result", "step", "metric", "value"]
+    assert all(df[param].dtype == "category" for param in params)
+
+    num_values = sum(
+        len(df_run) * len(df_run.columns)
+        for trial in analysis._trials.values()
+        for results in trial.runs.values()
+        for df_run in results.values()
+    )
+    assert len(df) == num_values
+
+    trial = analysis.select(learning_rate=0.1, batch_size=32, optimizer="Adam")
+    trial = list(trial.values())[0]
+    run_dir = sorted(trial.runs)[0]
+    run_id = int(os.path.basename(run_dir)[3:])
+
+    rows = df[
+        (df.learning_rate == 0.1) & (df.batch_size == 32) & (df.optimizer == "Adam")
+        & (df.run == run_id) & (df.result == "data") & (df.metric == "foo")
+    ]
+    assert list(rows.step) == list(range(len(trial.runs[run_dir]["data"])))
+    assert np.allclose(rows.value, trial.runs[run_dir]["data"]["foo"])
+
+    means = df[df.metric == "foo"].groupby("learning_rate", observed=True).value.mean()
+    assert len(means) == 2
+
+
+def test_to_frame_with_filters(analysis):
+    df = analysis.to_frame(results=["data"], metrics=["foo", "bar"])
+    assert set(df.result) == {"data"}
+    assert set(df.metric) == {"foo", "bar"}
+
+    full = analysis.to_frame()
+    expected = full[(full.result == "data") & full.metric.isin(["foo", "bar"])]
+    assert len(df) == len(expected)
+
+
+def test_iter_frames(analysis):
+    chunks = list(analysis.iter_frames(chunksize=4, results=["metric"]))
+    assert len(chunks) == (len(analysis) + 3) // 4
+
+    df = pd.concat(chunks, ignore_index=True)
+    expected = analysis.to_frame(results=["metric"])
+    pd.testing.assert_frame_equal(df, expected)
+
+
+@pytest.fixture(scope="function")
+def live_experiment():
+    logdir = "/tmp/tuneconfig_live"
+    config_factory = ConfigFactory({"lr": grid_search([0.1, 0.01]), "epochs": 10})
+    experiment = Experiment(config_factory, logdir)
+    experiment.start()
+    yield experiment
+    shutil.rmtree(logdir)
+
+
+def test_refresh(live_experiment, monkeypatch):
+    # Runs are written without Experiment.run, so they are not in the manifest.
+    os.remove(os.path.join(live_experiment.logdir, Experiment.MANIFEST_FILE))
+
+    analysis = ExperimentAnalysis(live_experiment.logdir)
+    analysis.setup(snapshot=False)
+    assert len(analysis) == 2
+    assert all(len(trial) == 0 for trial in analysis._trials.values())
+    assert not analysis.refresh()
+
+    config = list(live_experiment.config_iterator)[0]
+    _, trial_dir = live_experiment._get_trial(config)
+    run_dir = os.path.join(trial_dir, "run0")
+
+    logger = RunLogger(run_dir, flush_every=1)
+    for step in range(5):
+        logger.log({"step": step, "loss": 1.0 / (step + 1)})
+
+    assert analysis.refresh()
+    trial = analysis._trials[trial_dir]
+    assert len(trial) == 1
+    assert list(trial.get_stats("data")[("step", "mean")]) == list(range(5))
+
+    read_csv = pd.read_csv
+    num_bytes = []
+
+    def counting_read_csv(buffer, *args, **kwargs):
+        num_bytes.append(len(buffer.getvalue()))
+        return read_csv(buffer, *args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_csv", counting_read_csv)
+
+    for step in range(5, 8):
+        logger.log({"step": step, "loss": 1.0 / (step + 1)})
+    with open(logger.get_filepath("data"), "a") as file:
+        file.write("8,0.1")
+
+    assert analysis.refresh()
+    assert len(num_bytes) == 1
+    assert num_bytes[0] < os.path.getsize(logger.get_filepath("data")) / 2
+
+    df = trial.runs[run_dir]["data"]
+    assert list(df["step"]) == list(range(8))
+    assert list(df.index) == list(range(8))
+    assert list(trial.get_stats("data")[("step", "mean")]) == list(range(8))
+
+    with open(logger.get_filepath("data"), "a") as file:
+        file.write("1\n")
+    assert analysis.refresh()
+    assert list(trial.runs[run_dir]["data"]["loss"])[-1] == 0.11
+
+    assert not analysis.refresh()
+    assert list(analysis.watch(interval=0.01, timeout=0.05)) == []
+
+
+def test_to_frame_with_empty_trials(live_experiment):
+    os.remove(os.path.join(live_experiment.logdir, Experiment.MANIFEST_FILE))
+
+    config = list(live_experiment.config_iterator)[0]
+    _, trial_dir = live_experiment._get_trial(config)
+    with RunLogger(os.path.join(trial_dir, "run0")) as logger:
+        for step in range(3):
+            logger.log({"step": step, "loss": 1.0 / (step + 1)})
+
+    analysis = ExperimentAnalysis(live_experiment.logdir)
+    analysis.setup(snapshot=False)
+    assert sorted(len(trial) for trial in analysis._trials.values()) == [0, 1]
+    assert [trial.metrics for trial in analysis._trials.values() if len(trial) == 0] == [{}]
+
+    df = analysis.to_frame()
+    assert len(df) == 3 * 2
+    assert set(df.lr) == {config["lr"]}
+
+
+def test_refresh_new_trials(live_experiment):
+    analysis = ExperimentAnalysis(live_experiment.logdir)
+    analysis.setup(snapshot=False)
+
+    factory = ConfigFactory({"lr": grid_search([0.1, 0.01, 0.001]), "epochs": 10})
+    experiment = Experiment(factory, live_experiment.logdir)
+    experiment.start()
+    experiment.run(conftest.exec_func, 2, 2, executor="serial")
+
+    assert analysis.refresh()
+    assert len(analysis) == 3
+    assert analysis.params["lr"] == [0.001, 0.01, 0.1]
+    assert all(len(trial) == 2 for trial in analysis._trials.values())
+    assert len(analysis.select(lr=0.001)) == 1
+
+
+def test_refresh_without_new_data(snapshot_logdir, monkeypatch):
+    analysis = ExperimentAnalysis(snapshot_logdir)
+    analysis.setup(snapshot=False)
+
+    # Run directories are listed again only after they change.
+    past = os.stat(snapshot_logdir).st_mtime - 60
+    for trial in analysis._trials.values():
+        for run_dir in trial.runs:
+            os.utime(run_dir, (past, past))
+    assert not analysis.refresh()
+
+    calls = []
+    for name in ["listdir", "scandir", "walk"]:
+        fn = getattr(os, name)
+        monkeypatch.setattr(os, name, lambda *args, fn=fn, name=name: calls.append(name) or fn(*args))
+
+    assert not analysis.refresh()
+    assert calls == []
+
+    trial = analysis[0]
+    run_dir = sorted(trial.runs)[0]
+    pd.DataFrame({"foo": [1, 2]}).to_csv(os.path.join(run_dir, "extra.csv"), index=False)
+    assert analysis.refresh()
+    assert calls == ["listdir"]
+    assert "extra" in trial.runs[run_dir]
+
+
+def test_setup_cache_max_bytes(snapshot_logdir):
+    analysis = ExperimentAnalysis(snapshot_logdir)
+    analysis.setup(snapshot=False, cache_max_bytes=2 ** 12)
+    for trial in analysis._trials.values():
+        trial.get_stats("data")
+    assert 0 < analysis._cache.nbytes <= 2 ** 12
+    assert all(trial._cache is analysis._cache for trial in analysis._trials.values())
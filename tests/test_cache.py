@@ -0,0 +1,59 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tuneconfig.cache import LRUCache, nbytes
+
+
+def test_nbytes():
+    array = np.zeros(100)
+    assert nbytes(array) == 800
+    assert nbytes((array, ["foo"], array)) == 1600
+    assert nbytes(pd.DataFrame({"foo": array})) >= 800
+    assert nbytes("foo") == 0
+
+
+def test_lru_eviction():
+    cache = LRUCache(max_bytes=2000)
+    cache.put("a", np.zeros(100))
+    cache.put("b", np.zeros(100))
+    assert cache.nbytes == 1600
+
+    assert cache.get("a") is not None
+    cache.put("c", np.zeros(100))
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.nbytes == 1600
+
+    cache.put("d", np.zeros(1000))
+    assert "d" not in cache
+    assert len(cache) == 2
+
+
+def test_get_or_compute():
+    cache = LRUCache(max_bytes=2000)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.ones(10)
+
+    value = cache.get_or_compute("a", compute)
+    assert cache.get_or_compute("a", compute) is value
+    assert len(calls) == 1
+
+    cache.clear()
+    assert cache.nbytes == 0
+    cache.get_or_compute("a", compute)
+    assert len(calls) == 2
+
+
+def test_pickle_drops_values():
+    cache = LRUCache(max_bytes=2000)
+    cache.put("a", np.zeros(10))
+    cache = pickle.loads(pickle.dumps(cache))
+    assert cache.max_bytes == 2000
+    assert len(cache) == 0
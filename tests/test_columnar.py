@@ -0,0 +1,67 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tuneconfig import columnar
+
+
+@pytest.fixture(scope="function")
+def csv_file():
+    dirname = "/tmp/tuneconfig_columnar"
+    os.makedirs(dirname)
+    filepath = os.path.join(dirname, "data.csv")
+    df = pd.DataFrame({
+        "step": np.arange(5),
+        "score": np.linspace(0.0, 1.0, 5),
+        "phase": ["a", "b", "a", None, "b"],
+    })
+    df.to_csv(filepath, index=False)
+    yield filepath
+    shutil.rmtree(dirname)
+
+
+def test_read_without_sidecar(csv_file):
+    assert columnar.read(csv_file) == (None, None)
+
+
+def test_write_and_read(csv_file):
+    df = pd.read_csv(csv_file)
+    columnar.write(csv_file, df, columnar.get_source(csv_file))
+    assert os.path.exists(columnar.get_sidecar(csv_file))
+
+    sidecar_df, size = columnar.read(csv_file)
+    pd.testing.assert_frame_equal(sidecar_df, df)
+    assert size == os.path.getsize(csv_file)
+
+    sidecar_df, _ = columnar.read(csv_file, ["score", "step"])
+    assert list(sidecar_df.columns) == ["score", "step"]
+    pd.testing.assert_frame_equal(sidecar_df, df[["score", "step"]])
+
+
+def test_stale_sidecar(csv_file):
+    columnar.write(csv_file, pd.read_csv(csv_file), columnar.get_source(csv_file))
+
+    sidecar = columnar.get_sidecar(csv_file)
+    assert columnar.is_fresh(csv_file, sidecar)
+
+    mtime = os.stat(csv_file).st_mtime_ns
+    os.utime(csv_file, ns=(mtime + 10 ** 9, mtime + 10 ** 9))
+
+    assert not columnar.is_fresh(csv_file, sidecar)
+    assert columnar.read(csv_file) == (None, None)
+
+
+def test_stale_sidecar_same_mtime(csv_file):
+    # Rows appended within one tick of the clock leave the mtime unchanged.
+    mtime = os.stat(csv_file).st_mtime_ns
+    columnar.write(csv_file, pd.read_csv(csv_file), columnar.get_source(csv_file))
+
+    with open(csv_file, "a") as file:
+        file.write("5,1.0,c\n")
+    os.utime(csv_file, ns=(mtime, mtime))
+
+    assert not columnar.is_fresh(csv_file, columnar.get_sidecar(csv_file))
+    assert columnar.read(csv_file) == (None, None)
@@ -1,9 +1,12 @@
+import itertools
 import json
 import os
 
 import pytest
 
-from tuneconfig.config_factory import ParamsIterator, grid_search, ConfigFactory
+from tuneconfig.config_factory import (
+    ParamsIterator, ProductSpace, ConfigFactory, ConfigView, grid_search)
+from tuneconfig.sampling import uniform, loguniform, choice, latin_hypercube, random_search
 
 
 def test_grid_search():
@@ -157,3 +160,210 @@ def test_create_config_factory_from_json():
     assert config_factory.get("horizon") == config_dict["horizon"]
     assert config_factory.get("lr") == config_dict["lr"][-1]
     assert config_factory.get("optimizer") == config_dict["optimizer"][-1]
+
+
+def test_product_space_matches_itertools_product():
+    values = [[1, 2, 3], ["a", "b"], [0.1], [True, False]]
+    space = ProductSpace(values)
+    expected = list(itertools.product(*values))
+    assert len(space) == len(expected)
+    assert list(space) == expected
+    assert [space[i] for i in range(len(space))] == expected
+    assert space[-1] == expected[-1]
+    with pytest.raises(IndexError):
+        space[len(space)]
+
+
+def test_tune_config_lazy_large_space():
+    config_factory = ConfigFactory({
+        f"param{i}": grid_search(list(range(10)))
+        for i in range(12)
+    })
+    assert len(config_factory) == 10 ** 12
+    assert config_factory[0] == {f"param{i}": 0 for i in range(12)}
+    assert config_factory[-1] == {f"param{i}": 9 for i in range(12)}
+    assert config_factory[123] == {
+        **{f"param{i}": 0 for i in range(9)},
+        "param9": 1, "param10": 2, "param11": 3,
+    }
+
+
+def test_tune_config_slice(config_factory):
+    view = config_factory[2:10:3]
+    assert isinstance(view, ConfigView)
+    assert len(view) == 3
+    assert list(view) == [config_factory[i] for i in range(2, 10, 3)]
+    assert view[-1] == config_factory[8]
+    assert list(view[1:]) == [config_factory[5], config_factory[8]]
+
+
+@pytest.mark.parametrize("strategy", ["strided", "contiguous"])
+def test_tune_config_shard(config_factory, strategy):
+    count = 4
+    shards = [config_factory.shard(i, count, strategy) for i in range(count)]
+    assert sum(len(shard) for shard in shards) == len(config_factory)
+
+    indices = sorted(shard.index(k) for shard in shards for k in range(len(shard)))
+    assert indices == list(range(len(config_factory)))
+
+    for shard in shards:
+        for k, config in enumerate(shard):
+            assert config == config_factory[shard.index(k)]
+
+
+def test_tune_config_shard_invalid(config_factory):
+    with pytest.raises(ValueError):
+        config_factory.shard(4, 4)
+    with pytest.raises(ValueError):
+        config_factory.shard(0, 4, strategy="random")
+
+
+def test_tune_config_manifest(config_factory):
+    filepath = "/tmp/tuneconfig/manifest.jsonl"
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+    shard = config_factory.shard(1, 3)
+    entries = shard.manifest(filepath)
+    assert len(entries) == len(shard)
+
+    with open(filepath, "r") as file:
+        lines = [json.loads(line) for line in file]
+    assert lines == entries
+
+    for task_id, entry in enumerate(entries):
+        assert entry["task_id"] == task_id
+        assert config_factory[entry["index"]] == entry["config"]
+        assert config_factory._trial_id(entry["config"]) == entry["trial_id"]
+        assert entry["seed"] is None
+
+
+def test_tune_config_ignore(config_factory):
+    ignore = [
+        {"batch_size": 128, "learning_rate": 0.1,},
+        {"batch_size": 32, "optimizer": "GradientDescent", "learning_rate": 0.01,},
+        {"horizon": 100, "batch_size": 64},
+        {"horizon": 40, "optimizer": "RMSProp", "batch_size": 64},
+    ]
+
+    valid_configs = [
+        config for config in config_factory
+        if config_factory._is_config_valid(config, ignore)
+    ]
+
+    constrained_factory = config_factory.exclude(ignore)
+    assert len(constrained_factory) == len(valid_configs)
+    assert list(constrained_factory) == valid_configs
+    assert [
+        constrained_factory[i] for i in range(len(constrained_factory))
+    ] == valid_configs
+    assert len(config_factory) == 18
+
+
+def test_tune_config_ignore_prunes_large_space():
+    config_factory = ConfigFactory(
+        {f"param{i}": grid_search(list(range(10))) for i in range(12)},
+        ignore=[{"param0": 0}, {"param1": 1, "param11": 1}],
+    )
+    assert len(config_factory) == 9 * 10 ** 11 - 9 * 10 ** 9
+    assert all(config["param0"] != 0 for config in config_factory[::10 ** 9])
+    assert config_factory[0]["param0"] == 1
+    assert config_factory[-1]["param0"] == 9
+
+
+def test_tune_config_ignore_everything(config_factory):
+    constrained_factory = config_factory.exclude({"horizon": 40})
+    assert len(constrained_factory) == 0
+    assert list(constrained_factory) == []
+
+
+def test_tune_config_sampled_params():
+    config_factory = ConfigFactory(
+        {
+            "batch_size": grid_search([32, 64]),
+            "learning_rate": loguniform(1e-4, 1e-1),
+            "momentum": uniform(0.0, 1.0),
+            "optimizer": choice(["Adam", "RMSProp"]),
+            "epochs": 100,
+        },
+        sampler=latin_hypercube(10, seed=0),
+    )
+    assert len(config_factory) == 20
+
+    configs = list(config_factory)
+    assert configs == [config_factory[i] for i in range(20)]
+    for config in configs:
+        assert config["epochs"] == 100
+        assert config["batch_size"] in [32, 64]
+        assert 1e-4 <= config["learning_rate"] < 1e-1
+        assert 0.0 <= config["momentum"] < 1.0
+        assert config["optimizer"] in ["Adam", "RMSProp"]
+        json.dumps(config)
+
+    ignored = config_factory.exclude({"optimizer": "Adam", "batch_size": 32})
+    assert all(
+        not (config["optimizer"] == "Adam" and config["batch_size"] == 32)
+        for config in ignored
+    )
+    assert len(ignored) == len([
+        config for config in configs
+        if not (config["optimizer"] == "Adam" and config["batch_size"] == 32)
+    ])
+
+
+def test_tune_config_sampled_params_unseeded(tmp_path):
+    config_dict = {
+        "batch_size": grid_search([32, 64]),
+        "lr": loguniform(1e-4, 1e-1),
+        "optimizer": choice(["Adam", "RMSProp"]),
+    }
+    config_factory = ConfigFactory(dict(config_dict), sampler=random_search(8))
+    configs = list(config_factory)
+    lrs = {config["lr"] for config in configs}
+
+    ignore = {"batch_size": 32}
+    assert list(config_factory.exclude(ignore)) == [
+        config for config in configs if config["batch_size"] != 32]
+
+    filepaths = config_factory.dump(str(tmp_path), ignore=ignore)
+    for filepath in filepaths:
+        with open(filepath) as file:
+            assert json.load(file)["lr"] in lrs
+
+    config_factory.set("epochs", 10)
+    assert [config["lr"] for config in config_factory] == [config["lr"] for config in configs]
+
+    # Another host reproduces the shards from the seed in the manifest.
+    entries = config_factory.shard(0, 2).manifest()
+    assert all(entry["seed"] == config_factory.seed for entry in entries)
+    other = ConfigFactory(
+        {**config_dict, "epochs": 10}, sampler=random_search(8, seed=entries[0]["seed"]))
+    assert [entry["config"] for entry in entries] == list(other.shard(0, 2))
+
+
+def test_tune_config_sampled_params_require_sampler():
+    with pytest.raises(ValueError):
+        ConfigFactory({"learning_rate": loguniform(1e-4, 1e-1)})
+
+
+def test_create_config_factory_with_sampler_from_json():
+    config_dict = {
+        "batch_size": ["__grid_search__", [32, 64]],
+        "horizon": 40,
+        "lr": ["__loguniform__", [1e-4, 1e-1]],
+        "momentum": ["__uniform__", [0.0, 0.9]],
+        "optimizer": ["__choice__", ["GradientDescent", "RMSProp"]],
+        "__sampler__": ["__sobol__", {"n": 16, "seed": 0}],
+    }
+
+    config_json = "/tmp/tuneconfig/experiment_sampler_config.json"
+    with open(config_json, "w") as file:
+        json.dump(config_dict, file)
+
+    config_factory = ConfigFactory.from_json(config_json)
+    assert len(config_factory) == 32
+    assert list(config_factory) == list(ConfigFactory.from_json(config_json))
+    for config in config_factory:
+        assert "__sampler__" not in config
+        assert 1e-4 <= config["lr"] < 1e-1
+        assert 0.0 <= config["momentum"] < 0.9
+        assert config["optimizer"] in ["GradientDescent", "RMSProp"]
@@ -0,0 +1,164 @@
+import multiprocessing as mp
+from multiprocessing import AuthenticationError
+import os
+import shutil
+import sys
+import time
+
+import pytest
+
+from tuneconfig.distributed import (
+    AUTHKEY_ENV, DEFAULT_PORT, DistributedExecutor, WorkerLostError, get_authkey, parse_address,
+    run_worker)
+from tuneconfig.experiment import Experiment
+
+sys.path.insert(0, os.path.abspath("tests"))
+import conftest
+
+
+def square(x):
+    return x * x
+
+
+def fail(x):
+    raise ValueError(f"failed {x}")
+
+
+def crash(x):
+    os._exit(1)
+
+
+def crash_once(path):
+    if not os.path.exists(path):
+        open(path, "w").close()
+        os._exit(1)
+    return "ok"
+
+
+def start_workers(executor, num_workers, authkey=None):
+    # Workers are spawned (not forked) so that they do not inherit the
+    # coordinator's listening socket, as with workers on other hosts.
+    ctx = mp.get_context("spawn")
+    workers = [
+        ctx.Process(target=run_worker, args=(executor.address, authkey or executor.authkey))
+        for _ in range(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    assert executor.wait_for_workers(num_workers, timeout=60)
+    return workers
+
+
+@pytest.fixture(scope="module")
+def cluster():
+    num_workers = 3
+    executor = DistributedExecutor(
+        num_workers=num_workers, address=("127.0.0.1", 0))
+
+    workers = start_workers(executor, num_workers)
+    assert executor.num_connected == num_workers
+
+    yield executor
+
+    executor.shutdown()
+    for worker in workers:
+        worker.join(timeout=10)
+        assert not worker.is_alive()
+
+
+def test_distributed_map_unordered(cluster):
+    results = dict(cluster.map_unordered(square, range(30)))
+    assert results == {i: i * i for i in range(30)}
+
+
+def test_distributed_submit_raises(cluster):
+    with pytest.raises(ValueError):
+        cluster.submit(fail, 1).result(timeout=10)
+
+
+def test_distributed_experiment(cluster, config_factory):
+    logdir = "/tmp/tuneconfig_7"
+    num_samples = 2
+
+    experiment = Experiment(config_factory, logdir)
+    experiment.start()
+    results = experiment.run(
+        conftest.exec_func, num_samples, executor=cluster)
+    assert len(results) == len(experiment.config_iterator)
+
+    pids = set()
+    for config in experiment.config_iterator:
+        trial_id, trial_dir = experiment._get_trial(config)
+        run_dirs = sorted(experiment.get_run_dirs(trial_dir))
+        assert len(run_dirs) == num_samples
+        for run_dir in run_dirs:
+            assert os.path.exists(os.path.join(run_dir, "data.csv"))
+        pids.update(pid for pid, _, _, _ in results[trial_id])
+
+    assert os.getpid() not in pids
+
+    shutil.rmtree(logdir)
+
+
+def test_parse_address():
+    assert parse_address("node1:1234") == ("node1", 1234)
+    assert parse_address(":1234") == ("localhost", 1234)
+
+
+def test_authkey(monkeypatch):
+    monkeypatch.delenv(AUTHKEY_ENV, raising=False)
+    assert get_authkey() is None
+    assert get_authkey("secret") == "secret"
+    with pytest.raises(ValueError):
+        DistributedExecutor(address=("0.0.0.0", 0))
+    with pytest.raises(ValueError):
+        run_worker(("127.0.0.1", DEFAULT_PORT))
+
+    # Coordinators on loopback addresses generate a random secret.
+    executors = [DistributedExecutor(address=("127.0.0.1", 0)) for _ in range(2)]
+    assert len({executor.authkey for executor in executors}) == 2
+    for executor in executors:
+        executor.shutdown()
+
+    monkeypatch.setenv(AUTHKEY_ENV, "secret")
+    assert get_authkey() == "secret"
+    with DistributedExecutor(address=("127.0.0.1", 0)) as executor:
+        assert executor.authkey == "secret"
+        start_workers(executor, 1, authkey="secret")
+        assert executor.submit(square, 2).result(timeout=30) == 4
+
+
+def test_authkey_rejected():
+    with DistributedExecutor(address=("127.0.0.1", 0)) as executor:
+        with pytest.raises(AuthenticationError):
+            run_worker(executor.address, "wrong", timeout=0)
+
+
+def test_distributed_worker_lost():
+    executor = DistributedExecutor(
+        address=("127.0.0.1", 0), authkey="test", heartbeat_timeout=1.0, max_retries=0)
+    workers = start_workers(executor, 1)
+
+    with pytest.raises(WorkerLostError):
+        executor.submit(crash, 1).result(timeout=30)
+    assert executor.num_connected == 0
+
+    start = time.time()
+    executor.shutdown()
+    assert time.time() - start < 5
+    workers[0].join(timeout=10)
+
+
+def test_distributed_worker_lost_requeue(tmp_path):
+    executor = DistributedExecutor(
+        address=("127.0.0.1", 0), authkey="test", heartbeat_timeout=1.0, max_retries=1)
+    workers = start_workers(executor, 2)
+
+    assert executor.submit(crash_once, str(tmp_path / "crashed")).result(timeout=30) == "ok"
+    assert executor.submit(square, 3).result(timeout=30) == 9
+    assert executor.wait_for_workers(1) and executor.num_connected == 1
+
+    executor.shutdown()
+    for worker in workers:
+        worker.join(timeout=10)
+        assert not worker.is_alive()
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tuneconfig.analysis import ExperimentAnalysis
+from tuneconfig.downsample import downsample, lttb, minmax
+
+
+def reference_lttb(x, y, max_points):
+    num_points = len(y)
+    every = (num_points - 2) / (max_points - 2)
+    indices = [0]
+    a = 0
+    for k in range(max_points - 2):
+        start = int(np.floor(k * every)) + 1
+        end = int(np.floor((k + 1) * every)) + 1
+        next_start = end
+        next_end = min(int(np.floor((k + 2) * every)) + 1, num_points)
+        cx, cy = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        areas = [
+            abs((x[a] - cx) * (y[j] - y[a]) - (x[a] - x[j]) * (cy - y[a]))
+            for j in range(start, end)
+        ]
+        a = start + int(np.argmax(areas))
+        indices.append(a)
+    indices.append(num_points - 1)
+    return np.array(indices)
+
+
+@pytest.fixture(scope="module")
+def curve():
+    rng = np.random.default_rng(0)
+    x = np.arange(10000, dtype=float)
+    y = np.sin(x / 500) + rng.normal(scale=0.1, size=len(x))
+    return x, y
+
+
+@pytest.mark.parametrize("max_points", [3, 10, 257, 1000])
+def test_lttb(curve, max_points):
+    x, y = curve
+    indices = lttb(x, y, max_points)
+    assert len(indices) == max_points
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert np.all(np.diff(indices) > 0)
+    assert np.array_equal(indices, reference_lttb(x, y, max_points))
+
+
+def test_lttb_short_curve(curve):
+    x, y = curve
+    assert np.array_equal(lttb(x[:10], y[:10], 100), np.arange(10))
+
+
+@pytest.mark.parametrize("max_points", [2, 11, 500])
+def test_minmax(curve, max_points):
+    x, y = curve
+    indices = minmax(x, y, max_points)
+    assert len(indices) <= max_points
+    assert np.all(np.diff(indices) > 0)
+    assert y[indices].max() == y.max()
+    assert y[indices].min() == y.min()
+
+
+def test_downsample_frame(curve):
+    _, y = curve
+    df = pd.DataFrame({"mean": y, "std": np.ones_like(y)}, index=np.arange(0, 2 * len(y), 2))
+
+    sampled = downsample(df, 100)
+    assert len(sampled) == 100
+    assert list(sampled.columns) == ["mean", "std"]
+    assert sampled.index[0] == 0 and sampled.index[-1] == df.index[-1]
+
+    assert downsample(df, len(df)) is df
+
+    with pytest.raises(ValueError):
+        downsample(df, 100, method="foo")
+
+
+def test_get_data_max_points(trial):
+    data = ExperimentAnalysis.get_data(trial, "data:foo", max_points=5)
+    assert len(data) == 5
+    assert ExperimentAnalysis.get_data(trial, "data:foo", max_points=5) is data
+
+    data = ExperimentAnalysis.get_data(trial, "data:foo#iqr", max_points=6, downsample="minmax")
+    assert len(data) <= 6
+    assert list(data.columns) == ["center", "lower", "upper"]
+
+    data = ExperimentAnalysis.get_data(trial, "mean/data:foo", max_points=2)
+    assert isinstance(data, pd.Series)
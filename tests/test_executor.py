@@ -0,0 +1,60 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tuneconfig.executor import (
+    EXECUTORS, Executor, AsyncioExecutor, SerialExecutor, get_executor)
+
+
+def square(x):
+    return x * x
+
+
+async def async_square(x):
+    await asyncio.sleep(0.01)
+    return x * x
+
+
+def fail(x):
+    raise RuntimeError(f"failed {x}")
+
+
+@pytest.mark.parametrize("name", list(EXECUTORS))
+def test_map_unordered(name):
+    with get_executor(name, num_workers=4) as executor:
+        assert isinstance(executor, Executor)
+        results = dict(executor.map_unordered(square, range(20)))
+    assert results == {i: i * i for i in range(20)}
+
+
+@pytest.mark.parametrize("name", list(EXECUTORS))
+def test_submit_raises(name):
+    with get_executor(name, num_workers=2) as executor:
+        future = executor.submit(fail, 1)
+        with pytest.raises(RuntimeError):
+            future.result()
+
+
+def test_asyncio_executor_runs_coroutines_concurrently():
+    with AsyncioExecutor(num_workers=50) as executor:
+        start = time.perf_counter()
+        results = dict(executor.map_unordered(async_square, range(50)))
+        elapsed = time.perf_counter() - start
+    assert results == {i: i * i for i in range(50)}
+    assert elapsed < 0.25
+
+
+def test_serial_executor_runs_in_process():
+    thread_ids = []
+    with SerialExecutor() as executor:
+        executor.submit(lambda: thread_ids.append(threading.get_ident())).result()
+    assert thread_ids == [threading.get_ident()]
+
+
+def test_get_executor():
+    executor = SerialExecutor()
+    assert get_executor(executor) is executor
+    with pytest.raises(ValueError):
+        get_executor("gpu")
@@ -8,7 +8,8 @@ import sys
 import pandas as pd
 
 import tuneconfig
-from tuneconfig.experiment import Experiment, ExperimentMode
+from tuneconfig.experiment import Experiment, ExperimentMode, ManifestReader
+from tuneconfig.scheduler import ASHAScheduler
 
 sys.path.insert(0, os.path.abspath("tests"))
 import conftest
@@ -106,3 +107,200 @@ def test_run_in_overwrite_mode(experiment):
         _, trial_dir = experiment._get_trial(config)
         for mtime1, mtime2 in zip(mtimes1[trial_dir], mtimes2[trial_dir]):
             assert mtime1 != mtime2
+
+
+def test_run_shards(config_factory):
+    logdir = "/tmp/tuneconfig_5"
+    num_samples = num_workers = 2
+    count = 3
+
+    for index in range(count):
+        experiment = Experiment(config_factory.shard(index, count), logdir)
+        experiment.start()
+        results = experiment.run(conftest.exec_func, num_samples, num_workers)
+        assert len(results) == len(experiment.config_iterator)
+
+    for config in config_factory:
+        _, trial_dir = experiment._get_trial(config)
+        assert len(experiment.get_run_dirs(trial_dir)) == num_samples
+
+    shutil.rmtree(logdir)
+
+
+def test_run_with_ignore(config_factory):
+    logdir = "/tmp/tuneconfig_6"
+    num_samples = num_workers = 2
+    ignore = [{"batch_size": 128}, {"optimizer": "Adam", "learning_rate": 0.1}]
+
+    experiment = Experiment(config_factory.exclude(ignore), logdir)
+    experiment.start()
+    results = experiment.run(conftest.exec_func, num_samples, num_workers)
+    assert len(results) == 10
+
+    for config in config_factory:
+        _, trial_dir = experiment._get_trial(config)
+        if config_factory._is_config_valid(config, ignore):
+            assert len(experiment.get_run_dirs(trial_dir)) == num_samples
+        else:
+            assert not os.path.exists(trial_dir)
+
+    shutil.rmtree(logdir)
+
+
+def test_run_with_scheduler(experiment):
+    num_samples = 2
+    num_workers = 4
+    scheduler = ASHAScheduler(
+        metric="score", min_budget=1, max_budget=9, reduction_factor=3)
+
+    results = experiment.run(
+        conftest.scheduled_exec_func, num_samples, num_workers,
+        scheduler=scheduler)
+    assert len(results) == len(experiment.config_iterator)
+
+    budgets = []
+    for config in experiment.config_iterator:
+        trial_id, trial_dir = experiment._get_trial(config)
+        run_dirs = experiment.get_run_dirs(trial_dir)
+        assert len(run_dirs) == num_samples
+        assert len(results[trial_id]) == num_samples
+
+        # Trials are promoted as a whole, so all their runs reach the same rung.
+        trial_budgets = []
+        for run_dir in run_dirs:
+            rungs = pd.read_csv(os.path.join(run_dir, Experiment.RUNGS_FILE))
+            assert list(rungs.columns) == ["rung", "budget", "score"]
+            assert list(rungs["rung"]) == list(range(len(rungs)))
+            data = pd.read_csv(os.path.join(run_dir, "data.csv"))
+            assert len(data) == rungs["budget"].iloc[-1]
+            trial_budgets.append(list(rungs["budget"]))
+        assert all(run_budgets == trial_budgets[0] for run_budgets in trial_budgets)
+        assert [result["budget"] for result in results[trial_id]] == [trial_budgets[0][-1]] * num_samples
+        budgets.extend(trial_budgets[0])
+
+    num_candidates = len(experiment.config_iterator)
+    assert budgets.count(1) == num_candidates
+    assert budgets.count(3) < num_candidates
+    assert budgets.count(9) < budgets.count(3)
+
+    analysis = tuneconfig.ExperimentAnalysis(experiment.logdir)
+    analysis.setup()
+    assert "rungs" in analysis.results
+
+
+def test_run_with_scheduler_and_logger(experiment):
+    # Promoted runs restart from scratch, so results of previous rungs are removed.
+    scheduler = ASHAScheduler(
+        metric="score", min_budget=1, max_budget=9, reduction_factor=3)
+    experiment.run(conftest.logged_exec_func, 2, 4, scheduler=scheduler)
+
+    max_rung = 0
+    for config in experiment.config_iterator:
+        _, trial_dir = experiment._get_trial(config)
+        for run_dir in experiment.get_run_dirs(trial_dir):
+            rungs = pd.read_csv(os.path.join(run_dir, Experiment.RUNGS_FILE))
+            data = pd.read_csv(os.path.join(run_dir, "data.csv"))
+            assert list(data["step"]) == list(range(rungs["budget"].iloc[-1]))
+            max_rung = max(max_rung, len(rungs) - 1)
+    assert max_rung == 2
+
+
+def test_run_single_pool_preserves_run_order(experiment):
+    num_samples = 3
+    num_workers = 8
+
+    results = experiment.run(conftest.exec_func, num_samples, num_workers)
+    assert len(results) == len(experiment.config_iterator)
+
+    pids = set()
+    for trial_results in results.values():
+        assert [run_id for _, _, _, run_id in trial_results] == [
+            f"run{j}" for j in range(num_samples)]
+        pids.update(pid for pid, _, _, _ in trial_results)
+
+    assert len(pids) <= num_workers
+
+
+@pytest.mark.parametrize("executor", ["process", "thread", "serial"])
+def test_run_with_executor(experiment, executor):
+    num_samples = 2
+    num_workers = 4
+
+    results = experiment.run(
+        conftest.exec_func, num_samples, num_workers, executor=executor)
+    assert len(results) == len(experiment.config_iterator)
+
+    for trial_results in results.values():
+        assert [run_id for _, _, _, run_id in trial_results] == ["run0", "run1"]
+
+
+def test_run_with_asyncio_executor(experiment):
+    num_samples = 2
+    num_workers = 8
+
+    results = experiment.run(
+        conftest.async_exec_func, num_samples, num_workers, executor="asyncio")
+    assert len(results) == len(experiment.config_iterator)
+
+    for config in experiment.config_iterator:
+        _, trial_dir = experiment._get_trial(config)
+        assert len(experiment.get_run_dirs(trial_dir)) == num_samples
+
+
+def test_manifest(experiment):
+    num_samples = num_workers = 2
+
+    experiment.run(conftest.exec_func, num_samples, num_workers)
+    experiment.run(conftest.exec_func, num_samples, num_workers)
+
+    manifest = Experiment.read_manifest(experiment.logdir)
+    assert len(manifest) == len(experiment.config_iterator)
+
+    for config in experiment.config_iterator:
+        _, trial_dir = experiment._get_trial(config)
+        assert manifest[trial_dir]["config"] == config
+        assert sorted(manifest[trial_dir]["run_dirs"]) == sorted(experiment.get_run_dirs(trial_dir))
+
+    experiment.run(
+        conftest.exec_func, num_samples, num_workers,
+        mode=ExperimentMode.OVERWRITE)
+
+    manifest = Experiment.read_manifest(experiment.logdir)
+    for trial_dir, entry in manifest.items():
+        assert len(entry["run_dirs"]) == num_samples
+        assert sorted(entry["run_dirs"]) == sorted(experiment.get_run_dirs(trial_dir))
+
+
+def test_read_manifest_without_manifest():
+    assert Experiment.read_manifest("/tmp/tuneconfig_missing") is None
+
+
+def test_manifest_reader():
+    logdir = "/tmp/tuneconfig_manifest_reader"
+    os.makedirs(logdir, exist_ok=True)
+    filepath = os.path.join(logdir, Experiment.MANIFEST_FILE)
+
+    reader = ManifestReader(filepath)
+    assert reader.read() is None
+
+    with open(filepath, "w") as file:
+        file.write('{"event": "trial", "trial_id": "a=1", "config": {"a": 1}}\n')
+        file.write('{"event": "run", "trial_id": "a=1", "run_id": 0}\n')
+        file.write('{"event": "run", "trial_id": "a=1", "ru')
+    manifest = reader.read()
+    assert manifest == {os.path.join(logdir, "a=1"): {"config": {"a": 1}, "run_dirs": [os.path.join(logdir, "a=1", "run0")]}}
+
+    with open(filepath, "a") as file:
+        file.write('n_id": 1}\n')
+    offset = reader._offset
+    manifest = reader.read()
+    assert reader._offset == os.stat(filepath).st_size > offset
+    assert manifest[os.path.join(logdir, "a=1")]["run_dirs"] == [
+        os.path.join(logdir, "a=1", "run0"), os.path.join(logdir, "a=1", "run1")]
+    assert manifest == Experiment.read_manifest(logdir)
+
+    with open(filepath, "w") as file:
+        file.write('{"event": "trial", "trial_id": "a=2", "config": {"a": 2}}\n')
+    assert reader.read() == {os.path.join(logdir, "a=2"): {"config": {"a": 2}, "run_dirs": []}}
+
+    shutil.rmtree(logdir)
@@ -1,6 +1,17 @@
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
 import pytest
 
-from tuneconfig.grid import TrialGrid
+from tuneconfig.analysis import ExperimentAnalysis
+from tuneconfig.experiment import Experiment
+from tuneconfig.grid import TrialGrid, _get_trial_id
+
+sys.path.insert(0, os.path.abspath("tests"))
+import conftest
 
 
 @pytest.fixture(scope="module")
@@ -140,3 +151,76 @@ def test_grid_multiple_targets_both_axis(grid, cfg_multiple_targets_both_axis):
         for plots in trial_grid[y_values].values()
         for metrics in plots
     )
+
+
+def test_grid_traverse(grid, cfg_multiple_targets_both_axis):
+    targets, x_axis, y_axis, anchors = cfg_multiple_targets_both_axis
+    trial_grid = grid.select(anchors).build(targets, x_axis, y_axis)
+
+    entries = list(grid.traverse())
+    assert entries == list(grid.traverse())
+    assert len(entries) == sum(
+        len(plots) * len(targets) for cells in trial_grid.values() for plots in cells.values())
+
+    for (j, i, y, x, commonconfig), ids, df in entries:
+        assert y[1] in commonconfig and x[1] in commonconfig
+        assert not set(commonconfig) & set(ids[1].split("/"))
+        assert grid.get(x, y).index(*ids) < len(grid.get(x, y))
+
+
+def test_grid_layout_cache(grid, cfg_multiple_targets_both_axis, monkeypatch):
+    targets, x_axis, y_axis, anchors = cfg_multiple_targets_both_axis
+    grid.select(anchors).build(targets, x_axis, y_axis)
+
+    build_layout = TrialGrid._build_layout
+    calls = []
+
+    def counting_build_layout(self, *args):
+        calls.append(args)
+        return build_layout(self, *args)
+
+    monkeypatch.setattr(TrialGrid, "_build_layout", counting_build_layout)
+
+    grid.select(anchors).build(targets[:1], x_axis, y_axis, max_points=5)
+    assert calls == []
+    assert len(list(grid.traverse())) == 2 * 3 * len(grid.analyses)
+
+    grid.select(anchors).build(targets, y_axis, x_axis)
+    assert len(calls) == 1
+    assert grid.shape == (3, 2)
+
+
+def test_get_trial_id():
+    components = ("batch=32", "lr=0.1", "opt=Adam")
+    assert _get_trial_id(["batch=3", "lr=0.1"], None, None, components) == "batch=32/opt=Adam"
+    assert _get_trial_id(["lr=0.1"], ("Adam", "opt=Adam"), None, components) == "batch=32"
+
+
+def test_grid_layout_cache_reloaded_trials(config_factory):
+    logdir = "/tmp/tuneconfig_grid_reload"
+    experiment = Experiment(config_factory, logdir)
+    experiment.start()
+    experiment.run(conftest.exec_func, 1, 1, executor="serial")
+
+    analysis = ExperimentAnalysis(logdir)
+    analysis.setup(snapshot=False)
+    grid = TrialGrid(analysis)
+    anchors = ["batch_size=32", "learning_rate=0.1", "optimizer=Adam"]
+    grid.select(anchors).build(["data:foo"])
+    (_, _, df), = grid.traverse()
+
+    trial = list(analysis.get(anchors).values())[0]
+    run_dir = os.path.join(trial.logdir, "run1")
+    os.makedirs(run_dir)
+    pd.DataFrame({"foo": [1000.0] * 10, "baz": 0.0, "bar": 0.0}).to_csv(
+        os.path.join(run_dir, "data.csv"), index=False)
+    with open(os.path.join(run_dir, "metric.csv"), "w") as file:
+        file.write("test\n0\n")
+    os.remove(os.path.join(logdir, Experiment.MANIFEST_FILE))
+
+    analysis.setup(snapshot=False)
+    grid.select(anchors).build(["data:foo"])
+    (_, _, reloaded), = grid.traverse()
+    assert np.allclose(reloaded["mean"], (df["mean"] + 1000.0) / 2)
+
+    shutil.rmtree(logdir)
@@ -0,0 +1,65 @@
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+import tuneconfig
+
+
+def _run(code):
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True,
+        stdout=subprocess.PIPE, universal_newlines=True).stdout
+    return output, time.perf_counter() - start
+
+
+# Lazy imports rely on module-level __getattr__ (PEP 562).
+requires_pep562 = pytest.mark.skipif(sys.version_info < (3, 7), reason="requires Python 3.7")
+
+
+@requires_pep562
+def test_import_is_lazy():
+    code = (
+        "import sys, tuneconfig\n"
+        "factory = tuneconfig.ConfigFactory({'lr': tuneconfig.grid_search([0.01, 0.1])})\n"
+        "list(factory), factory.dump('/tmp/tuneconfig_lazy')\n"
+        "print(' '.join(m for m in ['numpy', 'pandas', 'matplotlib', 'tqdm'] if m in sys.modules))\n"
+    )
+    output, _ = _run(code)
+    assert output.split() == []
+
+    shutil.rmtree("/tmp/tuneconfig_lazy")
+
+
+@requires_pep562
+def test_import_time():
+    # Regression guard: generating grid search configs must take less time
+    # than loading numpy alone, the lightest of the heavy dependencies.
+    def best_of(code, repeat=3):
+        return min(_run(code)[1] for _ in range(repeat))
+
+    _run("import tuneconfig")
+    elapsed = best_of("import tuneconfig; tuneconfig.ConfigFactory, tuneconfig.grid_search")
+    baseline = best_of("import numpy")
+    assert elapsed < baseline
+
+
+def test_exports():
+    assert set(tuneconfig.__all__) <= set(dir(tuneconfig))
+    for name in tuneconfig.__all__:
+        assert getattr(tuneconfig, name).__name__ == name
+
+    with pytest.raises(AttributeError):
+        tuneconfig.TrialGrid  # pylint: disable=pointless-statement
+
+
+def test_submodules():
+    code = (
+        "import tuneconfig\n"
+        "print(tuneconfig.experiment.ExperimentMode.SKIP.name, tuneconfig.grid.TrialGrid.__name__)\n"
+    )
+    output, _ = _run(code)
+    assert output.split() == ["SKIP", "TrialGrid"]
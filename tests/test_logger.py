@@ -0,0 +1,95 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from tuneconfig.experiment import Experiment
+from tuneconfig.logger import RunLogger
+from tuneconfig.trial import Trial
+
+
+@pytest.fixture(scope="function")
+def run_dir():
+    trial_dir = "/tmp/tuneconfig_logger/lr=0.1"
+    os.makedirs(trial_dir)
+    with open(os.path.join(trial_dir, Experiment.CONFIG_FILE), "w") as file:
+        file.write('{"lr": 0.1}')
+    yield os.path.join(trial_dir, "run0")
+    shutil.rmtree("/tmp/tuneconfig_logger")
+
+
+def test_log(run_dir):
+    with RunLogger(run_dir) as logger:
+        for step in range(10):
+            logger.log({"step": step, "loss": 1.0 / (step + 1)})
+            logger.log({"accuracy": step / 10}, result="eval")
+
+    trial = Trial.from_directory(os.path.dirname(run_dir))
+    assert trial.metrics == {"data": ["loss", "step"], "eval": ["accuracy"]}
+
+    df = trial.runs[run_dir]["data"]
+    assert list(df["step"]) == list(range(10))
+    assert list(df["loss"]) == pytest.approx([1.0 / (step + 1) for step in range(10)])
+
+
+def test_buffering(run_dir):
+    logger = RunLogger(run_dir, flush_every=5, flush_interval=3600)
+    filepath = logger.get_filepath("data")
+
+    for step in range(4):
+        logger.log({"step": step})
+    assert len(pd.read_csv(filepath)) == 0
+
+    logger.log({"step": 4})
+    assert len(pd.read_csv(filepath)) == 5
+
+    logger.log({"step": 5})
+    logger.close()
+    assert list(pd.read_csv(filepath)["step"]) == list(range(6))
+
+
+def test_invalid_metrics(run_dir):
+    with RunLogger(run_dir) as logger:
+        logger.log({"step": 0, "loss": 1.0})
+        with pytest.raises(ValueError):
+            logger.log({"step": 1})
+
+
+def test_float_format(run_dir):
+    with RunLogger(run_dir, float_format="%.2f") as logger:
+        logger.log({"loss": 1.0 / 3})
+
+    with open(logger.get_filepath("data")) as file:
+        assert file.read() == "loss\n0.33\n"
+
+
+def test_recover_truncated_line(run_dir):
+    with RunLogger(run_dir) as logger:
+        for step in range(3):
+            logger.log({"step": step, "loss": float(step)})
+
+    filepath = logger.get_filepath("data")
+    with open(filepath, "a") as file:
+        file.write("3,0.5")
+
+    with RunLogger(run_dir) as logger:
+        logger.log({"loss": 3.0, "step": 3})
+
+    df = pd.read_csv(filepath)
+    assert list(df.columns) == ["step", "loss"]
+    assert list(df["step"]) == [0, 1, 2, 3]
+    assert list(df["loss"]) == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_recover_truncated_header(run_dir):
+    os.makedirs(run_dir)
+    filepath = os.path.join(run_dir, "data.csv")
+    with open(filepath, "w") as file:
+        file.write("ste")
+
+    with RunLogger(run_dir) as logger:
+        logger.log({"step": 0})
+
+    with open(filepath) as file:
+        assert file.read() == "step\n0\n"
@@ -1,9 +1,12 @@
 from pprint import pprint
+import json
+import os
 import time
 
 import matplotlib.pyplot as plt
 import pytest
 
+from tuneconfig import plotter as plotter_module
 from tuneconfig.plotter import ExperimentPlotter
 
 
@@ -38,3 +41,100 @@ def test_bar_plot(plotter, confplot):
     # plt.show()
     fig.clear()
     plt.close(fig)
+
+
+@pytest.mark.parametrize("aggregator", ["ci", "iqm", "iqr", "minmax"])
+def test_plot_with_aggregator(plotter, aggregator):
+    targets = [f"data:foo#{aggregator}"]
+    fig = plotter.plot(targets, None, "batch_size", ["learning_rate=0.1", "optimizer=Adam"])
+    assert isinstance(fig, plt.Figure)
+    fig.clear()
+    plt.close(fig)
+
+    plotter.kwargs["plot_type"] = "bar"
+    targets = [f"mean/data:foo#{aggregator}"]
+    fig = plotter.plot(targets, "optimizer", None, ["learning_rate=0.1"])
+    assert isinstance(fig, plt.Figure)
+    fig.clear()
+    plt.close(fig)
+
+
+@pytest.mark.parametrize("downsample", ["lttb", "minmax"])
+def test_plot_with_max_points(plotter, downsample):
+    targets = ["data:foo", "data:bar"]
+    fig = plotter.plot(
+        targets, "optimizer", None, ["learning_rate=0.1"],
+        max_points=4, downsample=downsample)
+    assert isinstance(fig, plt.Figure)
+    for ax in fig.axes:
+        assert all(len(line.get_xdata()) <= 4 for line in ax.get_lines())
+    fig.clear()
+    plt.close(fig)
+
+
+@pytest.fixture
+def spec_paths(tmp_path):
+    specs = {
+        "foo": {"targets": ["data:foo"], "x_axis": "optimizer", "anchors": ["learning_rate=0.1"]},
+        "bar": {"targets": ["data:bar#iqr"], "y_axis": "batch_size", "anchors": ["learning_rate=0.1", "optimizer=Adam"]},
+        "test": {"targets": ["metric:test"], "anchors": ["learning_rate=0.01", "optimizer=RMSProp"]},
+    }
+    paths = []
+    for name, spec in specs.items():
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps(spec))
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.parametrize("executor,fmt", [("process", "png"), ("serial", "pdf")])
+def test_render_specs(plotter, spec_paths, tmp_path, executor, fmt):
+    outdir = str(tmp_path / "figures")
+    filenames = plotter.render_specs(spec_paths, outdir, fmt=fmt, num_workers=2, executor=executor)
+    assert filenames == [os.path.join(outdir, f"{name}.{fmt}") for name in ["foo", "bar", "test"]]
+    assert all(os.path.getsize(filename) > 0 for filename in filenames)
+    assert plotter_module._PLOTTER is None
+
+
+@pytest.mark.parametrize("executor", ["thread", "asyncio"])
+def test_render_specs_invalid_executor(plotter, spec_paths, executor):
+    with pytest.raises(ValueError):
+        plotter.render_specs(spec_paths, executor=executor)
+
+
+def test_render_specs_without_shared_plotter(plotter, monkeypatch):
+    # Spawned workers do not inherit the plotter and set up the analyses again.
+    state = plotter._get_state()
+    monkeypatch.setattr(plotter_module, "_PLOTTER", None)
+
+    worker_plotter = plotter_module._get_plotter(state)
+    assert worker_plotter is not plotter
+    assert worker_plotter.kwargs == plotter.kwargs
+    assert [a.name for a in worker_plotter.analyses] == [a.name for a in plotter.analyses]
+    assert all(len(a) == len(b) for a, b in zip(worker_plotter.analyses, plotter.analyses))
+    assert plotter_module._get_plotter(state) is worker_plotter
+
+
+def test_main(analysis_list, spec_paths, tmp_path, capsys):
+    argv = [*spec_paths, "--outdir", str(tmp_path), "--format", "pdf", "--num-workers", "2"]
+    for analysis in analysis_list:
+        argv += ["--logdir", analysis.logdir, "--name", analysis.name]
+    plotter_module.main(argv)
+
+    filenames = capsys.readouterr().out.split()
+    assert filenames == [str(tmp_path / f"{name}.pdf") for name in ["foo", "bar", "test"]]
+    assert all(os.path.exists(filename) for filename in filenames)
+
+
+def test_plot_style(plotter):
+    facecolor = plt.rcParams["axes.facecolor"]
+    targets = ["data:foo"]
+    fig = plotter.plot(targets, "optimizer", None, ["learning_rate=0.1"])
+    with plt.style.context(plotter_module.get_style()):
+        expected = plt.rcParams["axes.facecolor"]
+    assert fig.axes[0].get_facecolor() == plt.matplotlib.colors.to_rgba(expected)
+    assert plt.rcParams["axes.facecolor"] == facecolor
+    fig.clear()
+    plt.close(fig)
+
+    assert plotter_module.get_style("ggplot") == "ggplot"
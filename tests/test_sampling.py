@@ -0,0 +1,89 @@
+import time
+
+import numpy as np
+import pytest
+
+from tuneconfig.sampling import (
+    Choice, SampledSpace,
+    uniform, loguniform, choice,
+    random_search, latin_hypercube, sobol,
+)
+
+
+@pytest.fixture(params=[random_search, latin_hypercube, sobol])
+def sampler_fn(request):
+    return request.param
+
+
+def test_sampler_unit_hypercube(sampler_fn):
+    n, d = 1000, 5
+    u = sampler_fn(n, seed=42).sample(d)
+    assert u.shape == (n, d)
+    assert np.all(u >= 0.0) and np.all(u < 1.0)
+
+
+def test_sampler_seed(sampler_fn):
+    u1 = sampler_fn(100, seed=0).sample(3)
+    u2 = sampler_fn(100, seed=0).sample(3)
+    u3 = sampler_fn(100, seed=1).sample(3)
+    assert np.array_equal(u1, u2)
+    assert not np.array_equal(u1, u3)
+
+
+def test_sampler_unseeded(sampler_fn):
+    sampler = sampler_fn(100)
+    assert isinstance(sampler.seed, int)
+    assert np.array_equal(sampler.sample(3), sampler.sample(3))
+    assert np.array_equal(sampler.sample(3), sampler_fn(100, seed=sampler.seed).sample(3))
+
+
+def test_latin_hypercube_strata():
+    n, d = 50, 4
+    u = latin_hypercube(n, seed=0).sample(d)
+    for k in range(d):
+        assert sorted((u[:, k] * n).astype(int)) == list(range(n))
+
+
+def test_sobol_unscrambled():
+    u = sobol(8, scramble=False).sample(2)
+    expected = [
+        [0.0, 0.0], [0.5, 0.5], [0.75, 0.25], [0.25, 0.75],
+        [0.375, 0.375], [0.875, 0.875], [0.625, 0.125], [0.125, 0.625],
+    ]
+    assert np.allclose(u, expected)
+
+
+def test_sobol_max_dimensions():
+    with pytest.raises(ValueError):
+        sobol(8).sample(22)
+
+
+def test_distributions():
+    u = np.linspace(0.0, 0.999, 100)
+
+    values = uniform(-1.0, 1.0).ppf(u)
+    assert np.all(values >= -1.0) and np.all(values < 1.0)
+
+    values = loguniform(1e-4, 1e-1).ppf(u)
+    assert np.all(values >= 1e-4) and np.all(values < 1e-1)
+    assert np.isclose(loguniform(1e-4, 1e-2).ppf(np.array([0.5]))[0], 1e-3)
+
+    dist = choice(["a", "b", "c"])
+    assert isinstance(dist, Choice)
+    assert {dist.value(x) for x in dist.ppf(u)} == {"a", "b", "c"}
+
+
+def test_sampled_space_vectorized():
+    n = 100000
+    start = time.perf_counter()
+    space = SampledSpace(
+        [loguniform(1e-4, 1e-1), uniform(0.0, 1.0), choice([32, 64])],
+        sobol(n, seed=0),
+    )
+    assert time.perf_counter() - start < 1.0
+
+    assert len(space) == n
+    lr, momentum, batch = space[n - 1]
+    assert isinstance(lr, float) and isinstance(momentum, float)
+    assert batch in [32, 64]
+    assert space.find(2, 32) | space.find(2, 64) == set(range(n))
@@ -0,0 +1,68 @@
+import pytest
+
+from tuneconfig.scheduler import ASHAScheduler
+
+
+def run_synchronously(scheduler, num_candidates, score_fn):
+    scheduler.reset(num_candidates)
+    jobs = []
+    while True:
+        job = scheduler.next_job()
+        if job is None:
+            break
+        candidate, rung = job
+        budget = scheduler.budget(candidate, rung)
+        scheduler.report(candidate, rung, score_fn(candidate, budget))
+        jobs.append((candidate, rung, budget))
+    return jobs
+
+
+def test_asha_rungs():
+    scheduler = ASHAScheduler(min_budget=1, max_budget=9, reduction_factor=3)
+    jobs = run_synchronously(scheduler, 9, lambda candidate, budget: -candidate)
+
+    budgets = [budget for _, _, budget in jobs]
+    assert budgets.count(1) == 9
+    assert budgets.count(3) == 3
+    assert budgets.count(9) == 1
+
+    top = [candidate for candidate, rung, _ in jobs if rung == 2]
+    assert top == [0]
+
+
+def test_asha_min_mode():
+    scheduler = ASHAScheduler(
+        metric="loss", mode="min", min_budget=1, max_budget=9, reduction_factor=3)
+    jobs = run_synchronously(
+        scheduler, 9, lambda candidate, budget: {"loss": candidate})
+    top = [candidate for candidate, rung, _ in jobs if rung == 2]
+    assert top == [0]
+
+
+def test_asha_promotes_asynchronously():
+    scheduler = ASHAScheduler(min_budget=1, max_budget=4, reduction_factor=2)
+    scheduler.reset(4)
+
+    assert scheduler.next_job() == (0, 0)
+    assert scheduler.next_job() == (1, 0)
+    scheduler.report(0, 0, 1.0)
+    scheduler.report(1, 0, 2.0)
+    assert scheduler.next_job() == (1, 1)
+    assert scheduler.next_job() == (2, 0)
+
+
+def test_hyperband_brackets():
+    scheduler = ASHAScheduler(
+        min_budget=1, max_budget=9, reduction_factor=3, brackets=3)
+    assert scheduler.brackets == 3
+    assert scheduler.budget(0, 0) == 1
+    assert scheduler.budget(1, 0) == 3
+    assert scheduler.budget(2, 0) == 9
+
+    jobs = run_synchronously(scheduler, 27, lambda candidate, budget: candidate)
+    assert sum(1 for _, rung, _ in jobs if rung == 0) == 27
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        ASHAScheduler(mode="median")
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tuneconfig import stats
+from tuneconfig.analysis import ExperimentAnalysis
+
+
+@pytest.fixture(scope="module")
+def tensor():
+    rng = np.random.default_rng(42)
+    tensor = rng.normal(size=(8, 30, 2))
+    tensor[5:, 20:] = np.nan
+    return tensor
+
+
+def test_std_band(tensor):
+    center, lower, upper = stats.StdBand()(tensor)
+    df = pd.DataFrame(tensor[:, :, 0])
+    assert np.allclose(center[:, 0], df.mean())
+    assert np.allclose(upper[:, 0] - center[:, 0], df.std())
+    assert np.allclose(center - lower, upper - center)
+
+
+def test_quantile_band(tensor):
+    center, lower, upper = stats.QuantileBand(0.1, 0.9)(tensor)
+    df = pd.DataFrame(tensor[:, :, 1])
+    assert np.allclose(center[:, 1], df.median())
+    assert np.allclose(lower[:, 1], df.quantile(0.1))
+    assert np.allclose(upper[:, 1], df.quantile(0.9))
+
+
+def test_iqm():
+    x = np.array([[1.0, 10.0], [2.0, np.nan], [3.0, 20.0], [4.0, 30.0], [100.0, 40.0]])
+    assert np.allclose(stats.iqm(x), [3.0, 25.0])
+
+    x = np.random.default_rng(0).normal(size=(12, 5))
+    trimmed = np.sort(x, axis=0)[3:9].mean(axis=0)
+    assert np.allclose(stats.iqm(x), trimmed)
+
+
+@pytest.mark.parametrize("statistic", ["mean", "median", "iqm"])
+def test_bootstrap_ci(tensor, statistic):
+    aggregator = stats.BootstrapCI(statistic, num_resamples=200, seed=1)
+    center, lower, upper = aggregator(tensor)
+    assert center.shape == lower.shape == upper.shape == (30, 2)
+    assert np.all(lower <= upper)
+    assert np.all((lower <= center + 1e-12) & (center - 1e-12 <= upper))
+
+    again = stats.BootstrapCI(statistic, num_resamples=200, seed=1)(tensor)
+    assert all(np.array_equal(a, b) for a, b in zip((center, lower, upper), again))
+
+    chunked = stats.BootstrapCI(statistic, num_resamples=200, seed=1, max_elements=1000)(tensor)
+    assert all(np.allclose(a, b) for a, b in zip((center, lower, upper), chunked))
+
+
+def test_bootstrap_ci_width(tensor):
+    _, lower90, upper90 = stats.BootstrapCI(confidence=0.9)(tensor)
+    _, lower99, upper99 = stats.BootstrapCI(confidence=0.99)(tensor)
+    assert np.all(upper90 - lower90 <= upper99 - lower99 + 1e-12)
+
+
+def test_get_aggregator():
+    assert stats.get_aggregator("ci") is stats.AGGREGATORS["ci"]
+    aggregator = stats.MinMaxBand()
+    assert stats.get_aggregator(aggregator) is aggregator
+    with pytest.raises(ValueError):
+        stats.get_aggregator("foo")
+    with pytest.raises(ValueError):
+        stats.BootstrapCI("mode")
+
+
+def test_get_data_with_aggregator(trial):
+    data = ExperimentAnalysis.get_data(trial, "data:foo#iqr")
+    assert list(data.columns) == stats.BAND
+    assert len(data) == 10
+
+    data = ExperimentAnalysis.get_data(trial, "mean/data:foo#ci")
+    assert list(data.index) == stats.BAND
+    assert data["lower"] <= data["center"] <= data["upper"]
@@ -1,6 +1,15 @@
+import os
+import shutil
+
+import numpy as np
 import pandas as pd
 import pytest
 
+from tuneconfig import columnar
+from tuneconfig.cache import LRUCache
+from tuneconfig.experiment import Experiment
+from tuneconfig.trial import ResultFile, Trial, read_result
+
 
 def test_info(trial):
     trial.info()
@@ -33,3 +42,250 @@ def test_get_all_stats(trial):
         assert isinstance(data, pd.DataFrame)
         assert all(col[1] in ["min", "max", "mean", "std"]
                    for col in data.columns)
+
+
+def test_lazy_results(analysis, monkeypatch):
+    dirname = analysis[0].logdir
+    for run_dir in Experiment.get_run_dirs(dirname):
+        for path in os.listdir(run_dir):
+            if not path.endswith(".csv"):
+                os.remove(os.path.join(run_dir, path))
+
+    read_csv = pd.read_csv
+    filepaths = []
+
+    def counting_read_csv(filepath, *args, **kwargs):
+        filepaths.append(filepath)
+        return read_csv(filepath, *args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_csv", counting_read_csv)
+
+    trial = Trial.from_directory(dirname)
+    assert trial.results == ["data", "metric"]
+    assert trial.metrics == {"data": ["bar", "baz", "foo"], "metric": ["test"]}
+    assert filepaths == []
+
+    data = trial.get_data("data", metric="foo")
+    assert all(list(df.columns) == ["foo"] for df in data)
+    assert len(filepaths) == len(trial)
+
+    data = trial.get_data("data")
+    assert all(list(df.columns) == ["foo", "baz", "bar"] for df in data)
+    assert len(filepaths) == len(trial)
+
+    trial = Trial.from_directory(dirname)
+    reloaded = trial.get_data("data", metric="foo")
+    assert all(list(df.columns) == ["foo"] for df in reloaded)
+    assert all(df1["foo"].equals(df2["foo"]) for df1, df2 in zip(data, reloaded))
+    assert len(filepaths) == len(trial)
+
+
+@pytest.fixture(scope="function")
+def ragged_trial():
+    frames = [
+        pd.DataFrame({"foo": np.random.rand(n), "bar": np.random.rand(n)})
+        for n in [5, 7, 3]
+    ]
+    runs = {f"run{k}": {"data": df} for k, df in enumerate(frames)}
+    return Trial("/tmp/ragged", {}, runs), frames
+
+
+def test_get_tensor(ragged_trial):
+    trial, frames = ragged_trial
+    tensor, metrics = trial.get_tensor("data")
+    assert tensor.shape == (3, 7, 2)
+    assert metrics == ["foo", "bar"]
+    assert np.isnan(tensor[0, 5:]).all()
+    assert np.isnan(tensor[2, 3:]).all()
+    assert np.array_equal(tensor[1], frames[1].to_numpy())
+
+    tensor, metrics = trial.get_tensor("data", metric="bar")
+    assert tensor.shape == (3, 7, 1)
+    assert metrics == ["bar"]
+
+
+@pytest.mark.parametrize("transform", [None, "cumsum", "mean"])
+def test_get_stats_matches_groupby(ragged_trial, transform):
+    trial, frames = ragged_trial
+    df = pd.concat([Trial._transform_metric(df, transform) for df in frames])
+    expected = df.groupby(df.index, sort=False).agg(["min", "max", "mean", "std"])
+
+    stats = trial.get_stats("data", transform=transform)
+    pd.testing.assert_frame_equal(stats, expected, check_index_type=False)
+
+
+def test_get_stats_with_quantiles(ragged_trial):
+    trial, frames = ragged_trial
+    stats = trial.get_stats("data", quantiles=[0.25, 0.5])
+    assert list(stats["foo"].columns) == ["min", "max", "mean", "std", "q25", "q50"]
+
+    df = pd.concat(frames)
+    expected = df.groupby(df.index, sort=False)["foo"].median()
+    assert np.allclose(stats[("foo", "q50")], expected)
+
+
+def test_stats_cache(ragged_trial):
+    trial, frames = ragged_trial
+    calls = []
+    get_data = trial.get_data
+
+    def counting_get_data(*args, **kwargs):
+        calls.append(args)
+        return get_data(*args, **kwargs)
+
+    trial.get_data = counting_get_data
+
+    stats = trial.get_stats("data")
+    assert trial.get_stats("data") is stats
+    assert len(calls) == 1
+
+    trial.get_stats("data", transform="mean")
+    trial.get_stats("data", transform="mean")
+    assert len(calls) == 2
+
+    trial.add_run("run3", {"data": frames[0]})
+    assert trial.get_stats("data") is not stats
+    assert len(calls) == 3
+
+
+def test_add_run(ragged_trial):
+    trial, frames = ragged_trial
+    trial.add_run("run3", {"data": frames[1]})
+    assert len(trial) == 4
+    assert trial.metrics == {"data": ["bar", "foo"]}
+    assert np.allclose(trial.get_stats("data")[("foo", "max")].iloc[:7], np.max(
+        [np.pad(df["foo"], (0, 7 - len(df)), constant_values=-1) for df in frames + [frames[1]]], axis=0))
+
+    chunks = list(trial.iter_stats("data", chunksize=4))
+    pd.testing.assert_frame_equal(pd.concat(chunks), trial.get_stats("data"), check_index_type=False)
+
+
+def test_shared_cache(ragged_trial):
+    trial, frames = ragged_trial
+    cache = LRUCache(2 ** 20)
+    trial1 = Trial("/tmp/ragged1", {}, dict(trial.runs), cache=cache)
+    trial2 = Trial("/tmp/ragged2", {}, dict(trial.runs), cache=cache)
+
+    stats1 = trial1.get_stats("data")
+    num_values = len(cache)
+    stats2 = trial2.get_stats("data")
+    assert stats1 is not stats2
+    assert len(cache) == 2 * num_values
+
+    trial1.add_run("run3", {"data": frames[0]})
+    assert len(cache) == num_values
+    assert trial2.get_stats("data") is stats2
+
+    cache.resize(0)
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_stats_cache_cap(ragged_trial):
+    trial, _ = ragged_trial
+    trial._cache.max_bytes = 0
+    stats = trial.get_stats("data")
+    assert trial.get_stats("data") is not stats
+    assert trial._cache.nbytes == 0
+
+
+def test_result_file_refresh():
+    filepath = "/tmp/tuneconfig_refresh.csv"
+    with open(filepath, "w") as file:
+        file.write("step,loss\n0,1.0\n1,0.5\n2,0.")
+
+    result_file = ResultFile(filepath)
+    assert result_file.refresh() == 0
+    assert list(result_file.load()["step"]) == [0, 1]
+
+    with open(filepath, "a") as file:
+        file.write("25\n3,0.2\n")
+    assert result_file.refresh() == 2
+    assert list(result_file.load()["loss"]) == [1.0, 0.5, 0.25, 0.2]
+
+    with open(filepath, "w") as file:
+        file.write("step,loss\n0,2.0\n")
+    assert result_file.refresh() == -1
+    assert list(result_file.load()["loss"]) == [2.0]
+
+    os.remove(filepath)
+
+
+def test_result_file_refresh_chunks():
+    filepath = "/tmp/tuneconfig_refresh_chunks.csv"
+    with open(filepath, "w") as file:
+        file.write("step,loss\n0,1.0\n")
+
+    result_file = ResultFile(filepath)
+    result_file.load(["step"])
+
+    for step in range(1, 4):
+        with open(filepath, "a") as file:
+            file.write(f"{step},{1.0 / (step + 1)}\n")
+        assert result_file.refresh() == 1
+        assert result_file.num_rows == step + 1
+
+    df = result_file.load()
+    assert list(df.index) == [0, 1, 2, 3]
+    assert list(df["step"]) == [0, 1, 2, 3]
+    assert list(df["loss"]) == [1.0, 0.5, 1 / 3, 0.25]
+
+    os.remove(filepath)
+
+
+def test_result_file_stale_sidecar():
+    filepath = "/tmp/tuneconfig_stale_sidecar.csv"
+    with open(filepath, "w") as file:
+        file.write("step,loss\n0,1.0\n1,0.5\n")
+    mtime = os.stat(filepath).st_mtime_ns
+    assert len(ResultFile(filepath).load()) == 2
+    assert os.path.exists(columnar.get_sidecar(filepath))
+
+    # A row appended within the same mtime tick is not served from the sidecar.
+    with open(filepath, "a") as file:
+        file.write("2,0.25\n")
+    os.utime(filepath, ns=(mtime, mtime))
+
+    result_file = ResultFile(filepath)
+    assert list(result_file.load()["step"]) == [0, 1, 2]
+    assert result_file.offset == os.path.getsize(filepath)
+
+    os.remove(filepath)
+    os.remove(columnar.get_sidecar(filepath))
+
+
+def test_read_result_and_restore():
+    filepath = "/tmp/tuneconfig_restore.csv"
+    pd.DataFrame({"step": range(4), "loss": [1.0, 0.5, 0.25, 0.125]}).to_csv(filepath, index=False)
+
+    assert read_result(filepath) == (filepath, os.path.getsize(filepath))
+
+    result_file = ResultFile(filepath)
+    assert not result_file.restore(0)
+    assert result_file.restore(os.path.getsize(filepath))
+    assert result_file.is_loaded
+    assert list(result_file.load()["loss"]) == [1.0, 0.5, 0.25, 0.125]
+
+    os.remove(filepath)
+    os.remove(columnar.get_sidecar(filepath))
+
+
+def test_iter_stats():
+    trial_dir = "/tmp/tuneconfig_iter_stats"
+    for k, num_steps in enumerate([23, 50, 7]):
+        run_dir = os.path.join(trial_dir, f"run{k}")
+        os.makedirs(run_dir)
+        df = pd.DataFrame({"foo": np.random.rand(num_steps), "bar": np.random.rand(num_steps)})
+        df.to_csv(os.path.join(run_dir, "data.csv"), index=False)
+
+    trial = Trial.from_directory(trial_dir, config={})
+    expected = trial.get_stats("data", quantiles=[0.5])
+
+    chunks = list(trial.iter_stats("data", chunksize=10, quantiles=[0.5]))
+    assert len(chunks) == 5
+    pd.testing.assert_frame_equal(pd.concat(chunks), expected, check_index_type=False)
+
+    chunks = list(trial.iter_stats("data", metric="bar", chunksize=16))
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks), trial.get_stats("data", metric="bar"), check_index_type=False)
+
+    shutil.rmtree(trial_dir)
@@ -1,5 +1,51 @@
-from tuneconfig.config_factory import ConfigFactory, grid_search
-from tuneconfig.experiment import Experiment
-from tuneconfig.analysis import ExperimentAnalysis
-from tuneconfig.plotter import ExperimentPlotter
-from tuneconfig.launcher import run_experiment
+import importlib
+import sys
+
+
+# Public names are imported from their submodules on first access (PEP 562),
+# so that `import tuneconfig` does not load pandas and matplotlib.
+_EXPORTS = {
+    "ConfigFactory": "tuneconfig.config_factory",
+    "grid_search": "tuneconfig.config_factory",
+    "uniform": "tuneconfig.sampling",
+    "loguniform": "tuneconfig.sampling",
+    "choice": "tuneconfig.sampling",
+    "random_search": "tuneconfig.sampling",
+    "latin_hypercube": "tuneconfig.sampling",
+    "sobol": "tuneconfig.sampling",
+    "Experiment": "tuneconfig.experiment",
+    "RunLogger": "tuneconfig.logger",
+    "ASHAScheduler": "tuneconfig.scheduler",
+    "ExperimentAnalysis": "tuneconfig.analysis",
+    "ExperimentPlotter": "tuneconfig.plotter",
+    "run_experiment": "tuneconfig.launcher",
+}
+
+# Submodules are also imported on first access, e.g. `tuneconfig.experiment.ExperimentMode`.
+_SUBMODULES = [
+    "analysis", "cache", "columnar", "config_factory", "distributed",
+    "downsample", "executor", "experiment", "grid", "launcher", "logger",
+    "plotter", "sampling", "scheduler", "stats", "trial",
+]
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name not in _EXPORTS:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_SUBMODULES))
+
+
+# Module-level __getattr__ is only supported from Python 3.7.
+if sys.version_info < (3, 7):
+    for _name in __all__:
+        __getattr__(_name)
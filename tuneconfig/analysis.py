@@ -1,11 +1,19 @@
 from collections import defaultdict
 import json
 import os
+import pickle
+import re
+import time
 
+import numpy as np
 import pandas as pd
+from tqdm import tqdm
 
-from tuneconfig.experiment import Experiment
-from tuneconfig.trial import Trial
+from tuneconfig.cache import LRUCache
+from tuneconfig.downsample import downsample as downsample_frame
+from tuneconfig.executor import Executor, get_executor
+from tuneconfig.experiment import Experiment, ManifestReader
+from tuneconfig.trial import Trial, read_result
 
 
 class ExperimentAnalysis:
@@ -15,6 +23,10 @@ class ExperimentAnalysis:
 
     RESULT_METRIC_SEPARATOR = ":"
     TRANSFORM_TARGET_SEPARATOR = "/"
+    AGGREGATOR_SEPARATOR = "#"
+
+    SNAPSHOT_FILE = "analysis.pkl"
+    SNAPSHOT_VERSION = 1
 
     @classmethod
     def split_target(cls, target):
@@ -25,29 +37,74 @@ class ExperimentAnalysis:
         return result, metric, transform
 
     @classmethod
-    def get_data(cls, trial, target, aggregate=True):
+    def split_aggregator(cls, target):
+        aggregator = None
+        if cls.AGGREGATOR_SEPARATOR in target:
+            target, aggregator = target.split(cls.AGGREGATOR_SEPARATOR)
+        return target, aggregator
+
+    @classmethod
+    def get_data(cls, trial, target, aggregate=True, max_points=None, downsample="lttb"):
+        """
+        Returns the data of a `trial` for a 'transform/result:metric#aggregator'
+        target, where the transform and aggregator are optional.
+
+        Aggregated data holds min/max/mean/std stats, or the center/lower/upper
+        band of the aggregator if one is given (see `tuneconfig.stats`). Given
+        `max_points`, aggregated curves are decimated with the `downsample`
+        method (see `tuneconfig.downsample`) and cached in the trial.
+        """
+        if aggregate and max_points is not None:
+            key = ("downsampled", target, max_points, downsample)
+            return trial.memoize(key, lambda: cls._downsample(
+                cls.get_data(trial, target, aggregate), max_points, downsample))
+
+        target, aggregator = cls.split_aggregator(target)
         result, metric, transform = cls.split_target(target)
         if aggregate:
-            data = trial.get_stats(result, transform=transform)
+            if aggregator is None:
+                data = trial.get_stats(result, transform=transform, metric=metric)
+            else:
+                data = trial.get_band(result, aggregator, transform=transform, metric=metric)
             return data[metric] if metric in data.columns else data.loc[metric]
         else:
-            data = trial.get_data(result, transform=transform)
+            data = trial.get_data(result, transform=transform, metric=metric)
             return [df[metric] for df in data]
 
+    @staticmethod
+    def _downsample(data, max_points, method):
+        if isinstance(data, pd.DataFrame):
+            return downsample_frame(data, max_points, method)
+        return data
+
     def __init__(self, logdir, name=None):
         self.logdir = logdir
         self.name = name
+        self._scan = False
+
+        # The cache of all trials, so that their memory is bounded as a whole.
+        self._cache = LRUCache(Trial.CACHE_MAX_BYTES)
 
+        self._reset()
+
+    def _reset(self):
         self._trials = {}
+        self._manifest = ManifestReader(os.path.join(self.logdir, Experiment.MANIFEST_FILE))
         self._params = defaultdict(set)
 
+        # Positional and inverted indices of the trials, which map
+        # (param, value) pairs and trial path components to positions.
+        self._names = []
+        self._param_index = defaultdict(set)
+        self._path_index = defaultdict(set)
+
     @property
     def params(self):
         return {key: sorted(values) for key, values in self._params.items()}
 
     @property
     def results(self):
-        return sorted(self[0][0])
+        return self[0].results
 
     @property
     def metrics(self):
@@ -71,23 +128,362 @@ class ExperimentAnalysis:
         for result, metrics in self.metrics.items():
             print(f"  - {result}({', '.join(metrics)})")
 
-    def setup(self):
+    def setup(self, snapshot=True, num_workers=None, executor="process", verbose=False, cache_max_bytes=None, scan=False):
+        """
+        Loads the trials in the experiment logdir.
+
+        Trials and runs whose files are unchanged since the last call (by
+        modification time and size) are reused instead of re-read. With
+        `snapshot=True`, the loaded trials are also saved to (and restored
+        from) a snapshot file in the logdir across sessions.
+
+        Result files are otherwise parsed lazily on first access. Given
+        `num_workers`, all of them are parsed upfront by a pool of workers,
+        whose columnar sidecars are then read back by this process.
+
+        Trials are found in the manifest of the logdir, which is only walked
+        if it has no manifest (i.e., written by older versions) or given
+        `scan=True` (e.g., for trials of older experiments in the same logdir).
+
+        Args:
+            snapshot (bool): Whether to use the snapshot file.
+            num_workers (int): (optional) The number of workers parsing result files.
+            executor (Union[str, Executor]): The name of the executor backend or an instance.
+            verbose (bool): Whether to display a progress bar.
+            cache_max_bytes (int): (optional) The memory cap of the data, stats
+                and tensors cached by all trials, by default `Trial.CACHE_MAX_BYTES`.
+            scan (bool): Whether to also walk the logdir for trials missing from the manifest.
+        """
+        # pylint: disable=too-many-arguments
+        self._scan = scan
+        if cache_max_bytes is not None:
+            self._cache.resize(cache_max_bytes)
+        self._cache.clear()
+
+        previous = self._load_snapshot() if snapshot else {}
+        previous.update(self._trials)
+
+        self._reset()
+
+        for dirname, config, run_dirs in self._get_trial_dirs():
+            trial = Trial.from_directory(
+                dirname, config=config, run_dirs=run_dirs, previous=previous.get(dirname),
+                cache=self._cache)
+            self._add_trial(dirname, trial)
+
+        num_loaded = 0
+        if num_workers is not None:
+            num_loaded = self._load_results(num_workers, executor, verbose)
+
+        if snapshot and (num_loaded > 0 or self._has_changed(previous)):
+            self._save_snapshot()
+
+    def _load_results(self, num_workers, executor, verbose):
+        files = [
+            results.file(result)
+            for trial in self._trials.values()
+            for results in trial.runs.values()
+            for result in results
+        ]
+        files = [file for file in files if not file.is_loaded]
+
+        if not files:
+            return 0
+
+        owned = not isinstance(executor, Executor)
+        executor = get_executor(executor, num_workers)
+
+        # Workers only return offsets: the parsed data is read back from the
+        # sidecars they write, instead of being pickled to this process.
+        # Files without an up-to-date sidecar are loaded on first access.
+        num_loaded = 0
+        try:
+            filepaths = [file.filepath for file in files]
+            with tqdm(total=len(files), desc="Loading results", unit="file", disable=not verbose) as pbar:
+                for i, (_, offset) in executor.map_unordered(read_result, filepaths):
+                    num_loaded += files[i].restore(offset)
+                    pbar.update()
+        finally:
+            if owned:
+                executor.shutdown()
+
+        return num_loaded
+
+    def refresh(self):
+        """
+        Picks up trials, runs and rows added since the last setup or refresh.
+
+        Returns:
+            bool: Whether anything changed.
+        """
+        changed = False
+        for dirname, config, run_dirs in self._get_trial_dirs():
+            trial = self._trials.get(dirname)
+            if trial is None:
+                trial = Trial.from_directory(
+                    dirname, config=config, run_dirs=run_dirs, cache=self._cache)
+                self._add_trial(dirname, trial)
+                changed = True
+            elif trial.refresh(run_dirs):
+                changed = True
+        return changed
+
+    def watch(self, interval=5.0, timeout=None):
+        """
+        Polls the logdir every `interval` seconds and yields the analysis
+        whenever `refresh` found new data, e.g., to re-plot running experiments.
+
+        Args:
+            interval (float): The number of seconds between polls.
+            timeout (float): (optional) The number of seconds to watch for.
+        """
+        start = time.monotonic()
+        while timeout is None or time.monotonic() - start < timeout:
+            if self.refresh():
+                yield self
+            time.sleep(interval)
+
+    def _get_trial_dirs(self):
+        # The manifest is authoritative for the trials it records, while
+        # logdirs without one (i.e., of experiments run by older versions)
+        # are walked, without descending into trials.
+        manifest = self._manifest.read()
+        if manifest is not None:
+            for dirname, entry in manifest.items():
+                if dirname in self._trials or os.path.isdir(dirname):
+                    yield dirname, entry["config"], entry["run_dirs"]
+            if not self._scan:
+                return
+        else:
+            manifest = {}
+
         for dirname, subdirs, filenames in os.walk(self.logdir):
-            if Experiment.is_trial_dir(dirname):
-                trial = Trial.from_directory(dirname)
-                self._trials[dirname] = trial
+            if dirname in manifest:
+                subdirs.clear()
+            elif Experiment.CONFIG_FILE in filenames:
+                subdirs.clear()
+                yield dirname, None, None
+
+    def _has_changed(self, previous):
+        if set(previous) != set(self._trials):
+            return True
+        return any(
+            trial.signatures != previous[dirname].signatures
+            for dirname, trial in self._trials.items()
+        )
+
+    def _load_snapshot(self):
+        filepath = os.path.join(self.logdir, self.SNAPSHOT_FILE)
+        if not os.path.exists(filepath):
+            return {}
+
+        try:
+            with open(filepath, "rb") as file:
+                snapshot = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return {}
+
+        if snapshot.get("version") != self.SNAPSHOT_VERSION:
+            return {}
 
-                for key, value in trial.config.items():
-                    if isinstance(value, list):
-                        value = tuple(value)
-                    self._params[key].add(value)
+        return snapshot["trials"]
+
+    def _save_snapshot(self):
+        filepath = os.path.join(self.logdir, self.SNAPSHOT_FILE)
+        tmp_filepath = f"{filepath}.{os.getpid()}.tmp"
+
+        snapshot = {"version": self.SNAPSHOT_VERSION, "trials": self._trials}
+        try:
+            with open(tmp_filepath, "wb") as file:
+                pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_filepath, filepath)
+        except OSError:
+            # The logdir may be read-only, in which case the snapshot is skipped.
+            if os.path.exists(tmp_filepath):
+                os.remove(tmp_filepath)
+
+    def _add_trial(self, dirname, trial):
+        position = len(self._names)
+        self._names.append(dirname)
+        self._trials[dirname] = trial
+
+        for key, value in trial.config.items():
+            value = self._hashable(value)
+            self._params[key].add(value)
+            self._param_index[(key, value)].add(position)
+
+        for component in self._split_path(os.path.relpath(dirname, self.logdir)):
+            self._path_index[component].add(position)
+
+    @staticmethod
+    def _hashable(value):
+        if isinstance(value, list):
+            return tuple(value)
+        if isinstance(value, dict):
+            return tuple(sorted(value.items()))
+        return value
+
+    @staticmethod
+    def _split_path(path):
+        return [component for component in path.split(os.sep) if component]
 
     def get(self, params_values):
-        trials = {}
-        for name, trial in self._trials.items():
-            if all(pv in name for pv in params_values):
-                trials[name] = trial
-        return trials
+        """
+        Returns the trials whose directory has all `params_values` as path components.
+
+        Args:
+            params_values (List[str]): The anchors, e.g., ['lr=0.1', 'batch=32'].
+
+        Returns:
+            Dict[str, Trial]: The matching trials indexed by directory.
+        """
+        positions = set(range(len(self._names)))
+        for anchor in params_values:
+            for component in self._split_path(anchor):
+                positions &= self._path_index.get(component, set())
+        return self._get_trials(positions)
+
+    def select(self, **params):
+        """
+        Returns the trials whose config matches all given parameter values.
+
+        A list of values matches any of them, e.g.,
+        `analysis.select(learning_rate=0.1, batch_size=[32, 64])`.
+
+        Returns:
+            Dict[str, Trial]: The matching trials indexed by directory.
+        """
+        positions = set(range(len(self._names)))
+        for param, values in params.items():
+            if param not in self._params:
+                raise ValueError(f"Invalid parameter '{param}'.")
+            if not isinstance(values, (list, set)):
+                values = [values]
+
+            matches = set()
+            for value in values:
+                matches |= self._param_index.get((param, self._hashable(value)), set())
+            positions &= matches
+
+        return self._get_trials(positions)
+
+    def _get_trials(self, positions):
+        return {
+            self._names[i]: self._trials[self._names[i]]
+            for i in sorted(positions)
+        }
+
+    def to_frame(self, results=None, metrics=None):
+        """
+        Returns the data of all trials as a single long-format DataFrame.
+
+        Each row holds one value of a metric at a step of a run, with the
+        trial params, 'run', 'result', 'step', 'metric' and 'value' columns.
+        Params, results and metrics are categorical columns.
+
+        Args:
+            results (List[str]): (optional) The results to include (all by default).
+            metrics (List[str]): (optional) The metrics to include (all by default).
+        """
+        return self._build_frame(self._names, results, metrics)
+
+    def iter_frames(self, chunksize, results=None, metrics=None):
+        """
+        Yields the long-format DataFrame of `to_frame` in chunks of `chunksize` trials.
+
+        All chunks share the same columns and categories.
+        """
+        for start in range(0, len(self._names), chunksize):
+            yield self._build_frame(self._names[start:start + chunksize], results, metrics)
+
+    def _build_frame(self, names, results=None, metrics=None):
+        # pylint: disable=too-many-locals
+        # Categories are taken from all trials, so that chunks share them.
+        params = self.params
+        trial_metrics = {name: trial.metrics for name, trial in self._trials.items()}
+        if results is None:
+            results = sorted({
+                result for metrics_by_result in trial_metrics.values() for result in metrics_by_result
+            })
+        all_metrics = sorted({
+            metric
+            for metrics_by_result in trial_metrics.values()
+            for result in results
+            for metric in metrics_by_result.get(result, [])
+            if metrics is None or metric in metrics
+        })
+
+        # Rows are gathered as one array per column and block of rows of a
+        # (trial, result), and per-block codes are repeated at the end.
+        run_ids, steps, metric_codes, values = [], [], [], []
+        block_trials, block_results, block_sizes = [], [], []
+
+        for t, name in enumerate(names):
+            trial = self._trials[name]
+            runs = np.array([self._get_run_id(run_dir) for run_dir in trial.runs])
+
+            for r, result in enumerate(results):
+                if result not in trial_metrics[name]:
+                    continue
+
+                if metrics is None:
+                    tensor, columns = trial.get_tensor(result)
+                    lengths = [len(df) for df in trial.get_data(result)]
+                else:
+                    columns = [metric for metric in metrics if metric in trial_metrics[name][result]]
+                    if not columns:
+                        continue
+                    tensor = np.concatenate(
+                        [trial.get_tensor(result, metric)[0] for metric in columns], axis=2)
+                    lengths = [len(df) for df in trial.get_data(result, metric=columns[0])]
+
+                num_steps = tensor.shape[1]
+                mask = np.arange(num_steps)[None, :] < np.array(lengths)[:, None]
+                mask = np.broadcast_to(mask[:, :, None], tensor.shape)
+                grid = np.indices(tensor.shape)
+
+                run_ids.append(runs[grid[0][mask]])
+                steps.append(grid[1][mask])
+                codes = np.array([all_metrics.index(metric) for metric in columns])
+                metric_codes.append(codes[grid[2][mask]])
+                values.append(tensor[mask])
+
+                block_trials.append(t)
+                block_results.append(r)
+                block_sizes.append(values[-1].size)
+
+        block_trials = np.array(block_trials, dtype=np.int64)
+        block_sizes = np.array(block_sizes, dtype=np.int64)
+
+        columns = {}
+        for param, categories in sorted(params.items()):
+            positions = {value: k for k, value in enumerate(categories)}
+            codes = np.array([
+                positions[self._hashable(self._trials[name].config[param])]
+                if param in self._trials[name].config else -1
+                for name in names
+            ], dtype=np.int64)
+            columns[param] = pd.Categorical.from_codes(
+                np.repeat(codes[block_trials], block_sizes), categories=categories)
+
+        def concat(arrays, dtype):
+            return np.concatenate(arrays) if arrays else np.array([], dtype=dtype)
+
+        columns["run"] = concat(run_ids, np.int64)
+        columns["result"] = pd.Categorical.from_codes(
+            np.repeat(np.array(block_results, dtype=np.int64), block_sizes),
+            categories=results)
+        columns["step"] = concat(steps, np.int64)
+        columns["metric"] = pd.Categorical.from_codes(
+            concat(metric_codes, np.int64), categories=all_metrics)
+        columns["value"] = concat(values, float)
+
+        return pd.DataFrame(columns)
+
+    @staticmethod
+    def _get_run_id(run_dir):
+        match = re.search(r"\d+$", os.path.basename(run_dir))
+        return int(match.group()) if match else -1
 
     def __str__(self):
         return f"ExperimentAnalysis(logdir='{self.logdir}', name='{self.name}')"
@@ -96,4 +492,4 @@ class ExperimentAnalysis:
         return len(self._trials)
 
     def __getitem__(self, i):
-        return list(self._trials.items())[i][1]
+        return self._trials[self._names[i]]
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def nbytes(value):
+    """Returns an estimate of the memory used by `value` in bytes."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    if isinstance(value, pd.Index):
+        return int(value.memory_usage())
+    if isinstance(value, (list, tuple)):
+        return sum(nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(nbytes(item) for item in value.values())
+    return 0
+
+
+class LRUCache:
+    """Least recently used cache bounded by the memory of its values.
+
+    Values are evicted, least recently used first, until the total size
+    is at most `max_bytes`. Values larger than `max_bytes` are not cached.
+    A cache may be shared by several owners (e.g., all trials of an
+    analysis) whose keys are tuples starting with their own namespace.
+    Cached values are shared with callers and must not be modified.
+
+    Args:
+        max_bytes (int): The memory cap in bytes.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._items = OrderedDict()
+
+    def get(self, key, default=None):
+        if key not in self._items:
+            return default
+        self._items.move_to_end(key)
+        return self._items[key][0]
+
+    def put(self, key, value):
+        self.pop(key)
+
+        size = nbytes(value)
+        if size > self.max_bytes:
+            return
+
+        self._items[key] = (value, size)
+        self.nbytes += size
+
+        self.resize(self.max_bytes)
+
+    def pop(self, key):
+        if key in self._items:
+            _, size = self._items.pop(key)
+            self.nbytes -= size
+
+    def get_or_compute(self, key, fn):
+        """Returns the value of `key`, calling `fn()` to compute and cache it if missing."""
+        if key in self._items:
+            return self.get(key)
+        value = fn()
+        self.put(key, value)
+        return value
+
+    def resize(self, max_bytes):
+        """Sets the memory cap to `max_bytes`, evicting values above it."""
+        self.max_bytes = max_bytes
+        while self.nbytes > self.max_bytes:
+            _, (_, evicted_size) = self._items.popitem(last=False)
+            self.nbytes -= evicted_size
+
+    def clear(self, namespace=None):
+        """Removes all values, or only those whose key is a tuple starting with `namespace`."""
+        if namespace is None:
+            self._items.clear()
+            self.nbytes = 0
+            return
+
+        for key in [key for key in self._items if key[0] == namespace]:
+            self.pop(key)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __reduce__(self):
+        # Cached values are not pickled, e.g. in analysis snapshots.
+        return (self.__class__, (self.max_bytes,))
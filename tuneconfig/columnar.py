@@ -0,0 +1,131 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:
+    feather = None
+
+
+FEATHER_EXTENSION = ".feather"
+NPZ_EXTENSION = ".npz"
+
+# The schema metadata key of the source of Feather sidecars.
+SOURCE_KEY = b"tuneconfig.source"
+
+
+def get_sidecar(filepath):
+    """Returns the path of the columnar sidecar of the CSV file in `filepath`.
+
+    Feather files are used if pyarrow is installed, otherwise `.npz` files.
+    """
+    extension = FEATHER_EXTENSION if feather is not None else NPZ_EXTENSION
+    return filepath + extension
+
+
+def get_source(filepath):
+    """Returns the modification time (in ns) and the size of the CSV file in `filepath`."""
+    stat = os.stat(filepath)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def is_fresh(filepath, sidecar):
+    """Returns whether `sidecar` exists and was written from the current contents of `filepath`."""
+    try:
+        return _read_source(sidecar) == get_source(filepath)
+    except FileNotFoundError:
+        return False
+
+
+def read(filepath, columns=None):
+    """
+    Returns the given columns of the CSV file in `filepath` from its sidecar,
+    along with the size of the CSV file the sidecar was written from.
+
+    The sidecar records the modification time and size of the CSV file it
+    was written from, and is out of date unless both are unchanged (the
+    modification time alone misses rows appended within one tick of a
+    coarse, e.g. NFS, clock).
+
+    Args:
+        filepath (str): The path of the CSV file.
+        columns (List[str]): (optional) The columns to read.
+
+    Returns:
+        Tuple[pd.DataFrame, int]: The data and its size in bytes, or
+        (None, None) if the sidecar is missing or out of date.
+    """
+    sidecar = get_sidecar(filepath)
+    try:
+        source = get_source(filepath)
+
+        if feather is not None:
+            table = feather.read_table(sidecar, columns=columns, memory_map=True)
+            if _get_source(table.schema.metadata) != source:
+                return None, None
+            df = table.to_pandas()
+            return (df if columns is None else df[columns]), source[1]
+
+        with np.load(sidecar, allow_pickle=True) as data:
+            if "source" not in data.files or tuple(data["source"].tolist()) != source:
+                return None, None
+            names = list(data["columns"])
+            columns = names if columns is None else columns
+            df = pd.DataFrame(
+                {col: data[f"col{names.index(col)}"] for col in columns},
+                columns=columns)
+            return df, source[1]
+    except FileNotFoundError:
+        return None, None
+
+
+def _get_source(metadata):
+    value = (metadata or {}).get(SOURCE_KEY)
+    return tuple(json.loads(value)) if value is not None else None
+
+
+def _read_source(sidecar):
+    if feather is not None:
+        return _get_source(feather.read_table(sidecar, columns=[], memory_map=True).schema.metadata)
+    with np.load(sidecar, allow_pickle=True) as data:
+        return tuple(data["source"].tolist()) if "source" in data.files else None
+
+
+def write(filepath, df, source):
+    """
+    Writes the sidecar of the CSV file in `filepath` with the contents of `df`.
+
+    The sidecar is written to a temporary file first and then renamed, so
+    that concurrent readers never see a partial file. Nothing is written if
+    the directory is read-only.
+
+    Args:
+        filepath (str): The path of the CSV file.
+        df (pd.DataFrame): The data of the CSV file.
+        source (Tuple[int, int]): The modification time and size of the CSV
+            file `df` was parsed from, see `get_source`.
+    """
+    sidecar = get_sidecar(filepath)
+    tmp_sidecar = f"{sidecar}.{os.getpid()}.tmp"
+
+    try:
+        if feather is not None:
+            table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+            table = table.replace_schema_metadata(
+                {**(table.schema.metadata or {}), SOURCE_KEY: json.dumps(list(source))})
+            feather.write_feather(table, tmp_sidecar, compression="uncompressed")
+        else:
+            with open(tmp_sidecar, "wb") as file:
+                np.savez(
+                    file,
+                    columns=np.array(df.columns, dtype=str),
+                    source=np.array(source, dtype=np.int64),
+                    **{f"col{k}": df[col].to_numpy() for k, col in enumerate(df.columns)})
+        os.replace(tmp_sidecar, sidecar)
+    except OSError:
+        if os.path.exists(tmp_sidecar):
+            os.remove(tmp_sidecar)
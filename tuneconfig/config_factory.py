@@ -1,6 +1,8 @@
+import importlib
 import itertools
 import json
 import os
+import sys
 
 
 def grid_search(lst):
@@ -15,26 +17,332 @@ class ParamsIterator:
         return iter(self._lst)
 
 
+class ProductSpace:
+    """Lazy cartesian product of value lists addressable by index.
+
+    Elements are enumerated in the same order as `itertools.product`, but
+    are decoded on demand from their mixed-radix index instead of being
+    materialized.
+
+    Args:
+        values (List[List]): The values of each axis.
+        exclude (List[Dict[int, Set[int]]]): (optional) patterns mapping axis
+            positions to value positions. Combinations matching all the
+            conditions of a pattern are pruned from the space.
+    """
+
+    def __init__(self, values, exclude=None):
+        self._values = values
+        self._radices = [len(vals) for vals in values]
+
+        self._exclude = list(exclude or [])
+        self._last_axis = [max(pattern, default=-1) for pattern in self._exclude]
+        self._counts = {}
+
+        if not self._exclude:
+            self._size = 1
+            for radix in self._radices:
+                self._size *= radix
+        elif any(not pattern for pattern in self._exclude):
+            self._size = 0
+        else:
+            self._size = self._count(0, frozenset(range(len(self._exclude))))
+
+    def _constrained(self, depth, alive):
+        return [p for p in alive if depth in self._exclude[p]]
+
+    def _child(self, depth, alive, value):
+        # Returns the patterns still matching after choosing `value` for
+        # axis `depth`, or None if one of them becomes fully matched.
+        child = []
+        for p in alive:
+            condition = self._exclude[p].get(depth)
+            if condition is None:
+                child.append(p)
+            elif value in condition:
+                if self._last_axis[p] == depth:
+                    return None
+                child.append(p)
+        return frozenset(child)
+
+    def _child_count(self, depth, alive, value):
+        child = self._child(depth, alive, value)
+        if child is None:
+            return 0, child
+        return self._count(depth + 1, child), child
+
+    def _count(self, depth, alive):
+        if depth == len(self._values):
+            return 1
+
+        key = (depth, alive)
+        if key not in self._counts:
+            constrained = self._constrained(depth, alive)
+            matched = set()
+            for p in constrained:
+                matched |= self._exclude[p][depth]
+
+            unmatched = self._radices[depth] - len(matched)
+            total = unmatched * self._count(depth + 1, alive - set(constrained))
+            for value in matched:
+                total += self._child_count(depth, alive, value)[0]
+
+            self._counts[key] = total
+
+        return self._counts[key]
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("ProductSpace index out of range")
+
+        if not self._exclude:
+            digits = []
+            for radix in reversed(self._radices):
+                i, digit = divmod(i, radix)
+                digits.append(digit)
+            digits.reverse()
+        else:
+            digits = []
+            alive = frozenset(range(len(self._exclude)))
+            for depth, radix in enumerate(self._radices):
+                if not self._constrained(depth, alive):
+                    digit, i = divmod(i, self._count(depth + 1, alive))
+                else:
+                    for digit in range(radix):
+                        count, child = self._child_count(depth, alive, digit)
+                        if i < count:
+                            alive = child
+                            break
+                        i -= count
+                digits.append(digit)
+
+        return tuple(vals[digit] for vals, digit in zip(self._values, digits))
+
+    def __iter__(self):
+        if not self._exclude:
+            yield from itertools.product(*self._values)
+        elif self._size > 0:
+            yield from self._iter(0, frozenset(range(len(self._exclude))), ())
+
+    def _iter(self, depth, alive, prefix):
+        if depth == len(self._values):
+            yield prefix
+            return
+
+        for digit, value in enumerate(self._values[depth]):
+            count, child = self._child_count(depth, alive, digit)
+            if count > 0:
+                yield from self._iter(depth + 1, child, prefix + (value,))
+
+
+class ConfigView:
+    """Lazy view over a range of indices of a ConfigFactory."""
+
+    def __init__(self, factory, indices):
+        self._factory = factory
+        self._indices = indices
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ConfigView(self._factory, self._indices[i])
+        return self._factory[self._indices[i]]
+
+    def __iter__(self):
+        for i in self._indices:
+            yield self._factory[i]
+
+    def _trial_id(self, config):
+        return self._factory._trial_id(config)
+
+    def index(self, i):
+        return self._indices[i]
+
+    def shard(self, index, count, strategy="strided"):
+        """
+        Returns the view over the configs assigned to shard `index` out of `count`.
+
+        Args:
+            index (int): The shard index in [0, count).
+            count (int): The total number of shards.
+            strategy (str): Either 'strided' (every count-th config) or
+                'contiguous' (a block of consecutive configs).
+        """
+        if not 0 <= index < count:
+            raise ValueError(f"Invalid shard index {index} for {count} shards.")
+
+        if strategy == "strided":
+            return ConfigView(self._factory, self._indices[index::count])
+        elif strategy == "contiguous":
+            size = len(self._indices)
+            start = index * size // count
+            stop = (index + 1) * size // count
+            return ConfigView(self._factory, self._indices[start:stop])
+        else:
+            raise ValueError(f"Not a valid shard strategy: '{strategy}'.")
+
+    def manifest(self, filepath=None):
+        """
+        Returns the job-array manifest of the view, optionally saved as JSON lines.
+
+        The k-th entry maps task `k` to the `index` that retrieves its config
+        from the original ConfigFactory via `__getitem__`. Entries also record
+        the `seed` of the sampler, if any, which reproduces sampled configs.
+        """
+        entries = []
+        for task_id, i in enumerate(self._indices):
+            config = self._factory[i]
+            entries.append({
+                "task_id": task_id,
+                "index": i,
+                "trial_id": self._factory._trial_id(config),
+                "config": config,
+                "seed": self._factory.seed,
+            })
+
+        if filepath:
+            with open(filepath, "w") as file:
+                for entry in entries:
+                    file.write(json.dumps(entry) + "\n")
+
+        return entries
+
+    def dump(self, basepath, ignore=None):
+        return self._factory._dump_configs(self, basepath, ignore)
+
+
+def _sampling():
+    # tuneconfig.sampling loads numpy, so it is only imported by factories
+    # with sampled parameters (e.g., not to generate grid search configs).
+    return importlib.import_module("tuneconfig.sampling")
+
+
 class ConfigFactory:
-    def __init__(self, config_dict, format_fn=None):
+    # The names of the samplers and distributions in tuneconfig.sampling.
+    SAMPLERS = {
+        "__random_search__": "random_search",
+        "__latin_hypercube__": "latin_hypercube",
+        "__sobol__": "sobol",
+    }
+
+    DISTRIBUTIONS = {
+        "__uniform__": "uniform",
+        "__loguniform__": "loguniform",
+        "__choice__": "choice",
+    }
+
+    def __init__(self, config_dict, format_fn=None, ignore=None, sampler=None):
         self._config_dict = config_dict
         self._format_fn = format_fn
+        self._ignore = self._get_ignore_list(ignore)
+        self._sampler = sampler
 
         self._reset()
 
     def _reset(self):
         self._base_dict = {}
         self._params_iterators = {}
+        self._distributions = {}
+
+        # Distributions can only be instantiated once tuneconfig.sampling is loaded.
+        sampling = sys.modules.get("tuneconfig.sampling")
 
         for param, value in self._config_dict.items():
             if isinstance(value, ParamsIterator):
                 self._params_iterators[param] = list(value)
+            elif sampling is not None and isinstance(value, sampling.Distribution):
+                self._distributions[param] = value
             else:
                 self._base_dict[param] = value
 
         self._params = list(self._params_iterators.keys())
         self._values = list(self._params_iterators.values())
-        self._value_instantiations = list(itertools.product(*self._values))
+
+        # All sampled parameters share a single axis of the product space
+        # whose elements are the joint samples drawn by the sampler.
+        self._sampled_params = list(self._distributions.keys())
+        self._sampled_space = None
+        axes = list(self._values)
+
+        if self._distributions:
+            if self._sampler is None:
+                raise ValueError(
+                    "Sampled parameters require a sampler (e.g., random_search(n)).")
+            self._sampled_space = sampling.SampledSpace(
+                list(self._distributions.values()), self._sampler)
+            axes.append(self._sampled_space)
+
+        self._value_instantiations = ProductSpace(
+            axes, self._compile_ignore(self._ignore))
+
+    def _compile_ignore(self, ignore):
+        # Translates each ignore dict into a pattern over the grid axes,
+        # dropping conditions that are always satisfied by the base config
+        # and patterns that can never match any config.
+        patterns = []
+
+        for no_config in ignore:
+            pattern = {}
+            for key, value in no_config.items():
+                if key in self._params_iterators:
+                    axis = self._params.index(key)
+                    matches = {
+                        j for j, val in enumerate(self._values[axis])
+                        if val == value
+                    }
+                elif key in self._distributions:
+                    axis = len(self._values)
+                    k = self._sampled_params.index(key)
+                    matches = self._sampled_space.find(k, value)
+                    matches &= pattern.get(axis, matches)
+                elif self._base_dict.get(key) != value:
+                    break
+                else:
+                    continue
+
+                if not matches:
+                    break
+                pattern[axis] = matches
+            else:
+                patterns.append(pattern)
+
+        return patterns
+
+    @staticmethod
+    def _get_ignore_list(ignore):
+        if ignore is None:
+            return []
+        if isinstance(ignore, dict):
+            return [ignore]
+        return list(ignore)
+
+    def exclude(self, ignore):
+        """
+        Returns a new ConfigFactory whose space also excludes the `ignore` configs.
+
+        Args:
+            ignore (Union[Dict, List[Dict]]): The partial configs to be excluded.
+        """
+        return ConfigFactory(
+            dict(self._config_dict),
+            format_fn=self._format_fn,
+            ignore=self._ignore + self._get_ignore_list(ignore),
+            sampler=self._sampler,
+        )
+
+    @property
+    def seed(self):
+        """The seed of the sampler of sampled parameters, or None."""
+        if self._sampler is None:
+            return None
+        return self._sampler.seed
 
     def get(self, param):
         if param not in self._config_dict:
@@ -57,21 +365,25 @@ class ConfigFactory:
         return len(self._value_instantiations)
 
     def __getitem__(self, i):
-        values = self._value_instantiations[i]
-        return {**self._base_dict, **dict(zip(self._params, values))}
+        if isinstance(i, slice):
+            return ConfigView(self, range(len(self))[i])
+        return self._make_config(self._value_instantiations[i])
 
     def __iter__(self):
-        self._index = 0
-        return self
+        for values in self._value_instantiations:
+            yield self._make_config(values)
 
-    def __next__(self):
-        i = self._index
-        self._index += 1
+    def _make_config(self, values):
+        config = {**self._base_dict, **dict(zip(self._params, values))}
+        if self._sampled_space is not None:
+            config.update(zip(self._sampled_params, values[-1]))
+        return config
 
-        if i == len(self._value_instantiations):
-            raise StopIteration
+    def shard(self, index, count, strategy="strided"):
+        return ConfigView(self, range(len(self))).shard(index, count, strategy)
 
-        return self[i]
+    def manifest(self, filepath=None):
+        return ConfigView(self, range(len(self))).manifest(filepath)
 
     def _trial_id(self, config):
         assignments = []
@@ -90,9 +402,14 @@ class ConfigFactory:
         return "/".join(assignments)
 
     def dump(self, basepath, ignore=None):
+        if ignore:
+            return self.exclude(ignore).dump(basepath)
+        return self._dump_configs(self, basepath)
+
+    def _dump_configs(self, configs, basepath, ignore=None):
         json_files_created = []
 
-        for config in self:
+        for config in configs:
             if not self._is_config_valid(config, ignore):
                 continue
 
@@ -111,14 +428,8 @@ class ConfigFactory:
         return json_files_created
 
     def _is_config_valid(self, config, ignore):
-        if ignore is None:
-            return True
-
-        if isinstance(ignore, dict):
-            ignore = [ignore]
-
         valid = True
-        for no_config in ignore:
+        for no_config in self._get_ignore_list(ignore):
             if all(config.get(key) == value for key, value in no_config.items()):
                 valid = False
                 break
@@ -126,9 +437,9 @@ class ConfigFactory:
         return valid
 
     @classmethod
-    def from_dict(cls, config_dict, format_fn=None):
+    def from_dict(cls, config_dict, format_fn=None, ignore=None):
         def _get_params_iterator(value):
-            valid_params_iterators = ["__grid_search__"]
+            valid_params_iterators = ["__grid_search__", *cls.DISTRIBUTIONS]
 
             if not isinstance(value, list):
                 return value
@@ -142,18 +453,38 @@ class ConfigFactory:
                         tuple(val) if isinstance(val, list) else val
                         for val in value[1]
                     ])
+                elif value[0] in cls.DISTRIBUTIONS:
+                    assert len(value) == 2
+                    assert isinstance(value[1], list)
+                    distribution = getattr(_sampling(), cls.DISTRIBUTIONS[value[0]])
+                    if value[0] == "__choice__":
+                        return distribution(value[1])
+                    return distribution(*value[1])
                 else:
                     raise ValueError(f"Not a valid ParamsIterator: '{value}'.")
 
+        def _get_sampler(value):
+            if value is None:
+                return None
+            if not isinstance(value, list) or value[0] not in cls.SAMPLERS:
+                raise ValueError(f"Not a valid sampler: '{value}'.")
+            kwargs = value[1] if len(value) > 1 else {}
+            return getattr(_sampling(), cls.SAMPLERS[value[0]])(**kwargs)
+
+        config_dict = dict(config_dict)
+        sampler = _get_sampler(config_dict.pop("__sampler__", None))
+
         return ConfigFactory(
             {
                 param: _get_params_iterator(value)
                 for param, value in config_dict.items()
             },
             format_fn=format_fn,
+            ignore=ignore,
+            sampler=sampler,
         )
 
     @classmethod
-    def from_json(cls, filepath, format_fn=None):
+    def from_json(cls, filepath, format_fn=None, ignore=None):
         with open(filepath, "r") as file:
-            return cls.from_dict(json.load(file), format_fn=format_fn)
+            return cls.from_dict(json.load(file), format_fn=format_fn, ignore=ignore)
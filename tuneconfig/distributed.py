@@ -0,0 +1,397 @@
+import argparse
+import concurrent.futures
+import ipaddress
+import itertools
+import multiprocessing as mp
+from multiprocessing.managers import BaseManager
+import os
+import queue
+import secrets
+import socket
+import sys
+import threading
+import time
+
+from tuneconfig.executor import Executor
+
+
+DEFAULT_PORT = 50000
+
+# The environment variable read by coordinators and workers without an explicit authkey.
+AUTHKEY_ENV = "TUNECONFIG_AUTHKEY"
+
+
+class WorkerLostError(ConnectionError):
+    """Raised by the future of a task whose worker died or stopped sending heartbeats."""
+
+
+def is_loopback(host):
+    """Returns whether `host` resolves to a loopback address ('' means all interfaces)."""
+    if not host:
+        return False
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+def get_authkey(authkey=None):
+    """Returns `authkey`, or else the one in the `TUNECONFIG_AUTHKEY` environment variable, if any."""
+    if authkey is not None:
+        return authkey
+    return os.environ.get(AUTHKEY_ENV)
+
+
+class _CoordinatorManager(BaseManager):
+    pass
+
+
+class _WorkerManager(BaseManager):
+    pass
+
+
+_COORDINATOR_METHODS = ("connect", "disconnect", "heartbeat", "get_task", "put_result")
+
+_WorkerManager.register("get_coordinator", exposed=_COORDINATOR_METHODS)
+
+
+class _Coordinator:
+    """The task queue of a DistributedExecutor and the bookkeeping of its workers.
+
+    Its methods are called by workers through the manager server. Each task
+    is assigned to the worker that pulls it, so that the tasks of a worker
+    that stops sending heartbeats can be requeued or failed.
+    """
+
+    def __init__(self, heartbeat_timeout, max_retries):
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_retries = max_retries
+
+        self._tasks = queue.Queue()
+        self._task_ids = itertools.count()
+
+        self._lock = threading.Lock()
+        self._workers_changed = threading.Condition(self._lock)
+
+        self._pending = {}
+        self._assigned = {}
+        self._last_seen = {}
+
+    def submit(self, fn, args):
+        future = concurrent.futures.Future()
+        with self._lock:
+            task_id = next(self._task_ids)
+            self._pending[task_id] = [future, fn, args, 0]
+        self._tasks.put(task_id)
+        return future
+
+    def close(self):
+        self._tasks.put(None)
+
+    def connect(self, worker_id):
+        """Registers a worker and returns its heartbeat interval."""
+        with self._workers_changed:
+            self._last_seen[worker_id] = time.monotonic()
+            self._workers_changed.notify_all()
+        return self.heartbeat_timeout / 4
+
+    def disconnect(self, worker_id):
+        with self._workers_changed:
+            self._remove_worker(worker_id)
+
+    def heartbeat(self, worker_id):
+        with self._workers_changed:
+            if worker_id not in self._last_seen:
+                self._workers_changed.notify_all()
+            self._last_seen[worker_id] = time.monotonic()
+
+    def get_task(self, worker_id, timeout):
+        """
+        Returns the next (task_id, fn, args) task assigned to `worker_id`,
+        None if there is none within `timeout` seconds, or a None task_id
+        once the executor shuts down.
+        """
+        try:
+            task_id = self._tasks.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+        if task_id is None:
+            self._tasks.put(None)
+            return (None, None, None)
+
+        with self._lock:
+            if task_id not in self._pending:
+                return None
+            if worker_id not in self._last_seen:
+                self._tasks.put(task_id)
+                return None
+            self._assigned[task_id] = worker_id
+            _, fn, args, _ = self._pending[task_id]
+        return (task_id, fn, args)
+
+    def put_result(self, worker_id, task_id, ok, value):
+        with self._lock:
+            if worker_id in self._last_seen:
+                self._last_seen[worker_id] = time.monotonic()
+            self._assigned.pop(task_id, None)
+            entry = self._pending.pop(task_id, None)
+
+        # Results of tasks already requeued and completed elsewhere are dropped.
+        if entry is None:
+            return
+
+        future = entry[0]
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+    def check_heartbeats(self):
+        deadline = time.monotonic() - self.heartbeat_timeout
+        with self._workers_changed:
+            for worker_id, last_seen in list(self._last_seen.items()):
+                if last_seen < deadline:
+                    self._remove_worker(worker_id)
+
+    def _remove_worker(self, worker_id):
+        # Requires the lock.
+        self._last_seen.pop(worker_id, None)
+        self._workers_changed.notify_all()
+
+        lost = [task_id for task_id, worker in self._assigned.items() if worker == worker_id]
+        for task_id in lost:
+            del self._assigned[task_id]
+            entry = self._pending[task_id]
+            entry[3] += 1
+            if entry[3] <= self.max_retries:
+                self._tasks.put(task_id)
+            else:
+                del self._pending[task_id]
+                entry[0].set_exception(
+                    WorkerLostError(f"Worker '{worker_id}' was lost while running task {task_id}."))
+
+    def fail_pending(self):
+        with self._lock:
+            entries = list(self._pending.values())
+            self._pending.clear()
+            self._assigned.clear()
+        for entry in entries:
+            entry[0].set_exception(WorkerLostError("The executor shut down before the task ran."))
+
+    @property
+    def num_connected(self):
+        with self._lock:
+            return len(self._last_seen)
+
+    def wait_for_workers(self, predicate, timeout):
+        with self._workers_changed:
+            return self._workers_changed.wait_for(
+                lambda: predicate(len(self._last_seen)), timeout)
+
+
+class DistributedExecutor(Executor):
+    """Coordinator of a pool of `tuneconfig-worker` agents, possibly on other hosts.
+
+    The coordinator serves a task queue over TCP. Each worker pulls
+    (task_id, fn, args) tasks, calls `fn(*args)` and pushes back the
+    outcome, which resolves the future returned by `submit`. Functions are
+    pickled by reference, so their module must be importable by the
+    workers, and runs are expected to write to a shared filesystem.
+
+    Workers send heartbeats while connected. The tasks of a worker that
+    misses them for `heartbeat_timeout` seconds (e.g., killed by the OOM
+    killer) are requeued up to `max_retries` times, after which their
+    futures fail with WorkerLostError.
+
+    Args:
+        num_workers (int): (optional) number of tasks kept in flight.
+        address (Tuple[str, int]): The (host, port) to listen to. Port 0
+            binds a free port, available afterwards as `self.address`.
+        authkey (str): The shared secret of coordinator and workers, by
+            default read from the `TUNECONFIG_AUTHKEY` environment variable.
+            Tasks and results are pickled, so anyone who can authenticate can
+            run code as the user: a secret is required unless the host is
+            loopback, for which a random one is generated (see `self.authkey`).
+        heartbeat_timeout (float): The seconds after which a silent worker is lost.
+        max_retries (int): The number of times the task of a lost worker is requeued.
+    """
+
+    SHUTDOWN_TIMEOUT = 60.0
+
+    def __init__(self, num_workers=None, address=("127.0.0.1", DEFAULT_PORT), authkey=None,
+                 heartbeat_timeout=10.0, max_retries=1):
+        # pylint: disable=too-many-arguments
+        super().__init__(num_workers or os.cpu_count())
+
+        authkey = get_authkey(authkey)
+        if authkey is None:
+            if not is_loopback(address[0]):
+                raise ValueError(f"An explicit authkey is required for non-loopback address '{address[0]}'.")
+            authkey = secrets.token_hex(16)
+        self.authkey = authkey
+
+        self._coordinator = _Coordinator(heartbeat_timeout, max_retries)
+
+        manager_cls = type("_Manager", (_CoordinatorManager,), {})
+        manager_cls.register(
+            "get_coordinator", callable=lambda: self._coordinator, exposed=_COORDINATOR_METHODS)
+        manager = manager_cls(address=address, authkey=authkey.encode())
+
+        self._server = manager.get_server()
+        self.address = self._server.address
+
+        # The accepter thread handles each connection in its own thread.
+        # Server.serve_forever is avoided since it resets sys.stdout.
+        self._server.stop_event = threading.Event()
+        self._accepter = threading.Thread(target=self._server.accepter, daemon=True)
+        self._accepter.start()
+
+        self._monitor = threading.Thread(target=self._check_heartbeats, daemon=True)
+        self._monitor.start()
+
+    def _check_heartbeats(self):
+        interval = self._coordinator.heartbeat_timeout / 4
+        while not self._server.stop_event.wait(interval):
+            self._coordinator.check_heartbeats()
+
+    @property
+    def num_connected(self):
+        return self._coordinator.num_connected
+
+    def wait_for_workers(self, count, timeout=None):
+        """Blocks until `count` workers have connected and returns whether they did."""
+        return self._coordinator.wait_for_workers(lambda connected: connected >= count, timeout)
+
+    def submit(self, fn, *args):
+        return self._coordinator.submit(fn, args)
+
+    def shutdown(self):
+        if self._server.stop_event.is_set():
+            return
+
+        # Workers forward the sentinel to each other before leaving, and
+        # the server keeps running until all live workers are gone.
+        self._coordinator.close()
+        self._coordinator.wait_for_workers(lambda connected: connected == 0, self.SHUTDOWN_TIMEOUT)
+        self._coordinator.fail_pending()
+
+        self._server.stop_event.set()
+        self._server.listener.close()
+
+
+def _connect(address, authkey, timeout):
+    start = time.time()
+    while True:
+        manager = _WorkerManager(address=address, authkey=authkey.encode())
+        try:
+            manager.connect()
+            return manager
+        except ConnectionError:
+            if time.time() - start > timeout:
+                raise
+            time.sleep(0.5)
+
+
+def _send_heartbeats(coordinator, worker_id, interval, stop_event):
+    while not stop_event.wait(interval):
+        try:
+            coordinator.heartbeat(worker_id)
+        except (EOFError, OSError):
+            break
+
+
+def run_worker(address, authkey=None, timeout=60.0):
+    """
+    Pulls and executes tasks from the coordinator at `address` until it shuts down.
+
+    The `authkey` of the coordinator is read from the `TUNECONFIG_AUTHKEY`
+    environment variable if not given.
+    """
+    authkey = get_authkey(authkey)
+    if authkey is None:
+        raise ValueError(f"The authkey of the coordinator is required (or set {AUTHKEY_ENV}).")
+    manager = _connect(address, authkey, timeout)
+    coordinator = manager.get_coordinator()
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    interval = coordinator.connect(worker_id)
+
+    # Proxies open one connection per thread, so heartbeats are sent
+    # while a task is running.
+    stop_event = threading.Event()
+    heartbeats = threading.Thread(
+        target=_send_heartbeats, args=(coordinator, worker_id, interval, stop_event), daemon=True)
+    heartbeats.start()
+
+    try:
+        while True:
+            try:
+                task = coordinator.get_task(worker_id, interval)
+            except (EOFError, OSError):
+                break
+
+            if task is None:
+                continue
+
+            task_id, fn, args = task
+            if task_id is None:
+                coordinator.disconnect(worker_id)
+                break
+
+            try:
+                coordinator.put_result(worker_id, task_id, True, fn(*args))
+            except Exception as error:  # pylint: disable=broad-except
+                try:
+                    coordinator.put_result(worker_id, task_id, False, error)
+                except Exception:  # pylint: disable=broad-except
+                    coordinator.put_result(worker_id, task_id, False, RuntimeError(repr(error)))
+    finally:
+        stop_event.set()
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(":")
+    return (host or "localhost", int(port or DEFAULT_PORT))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="tuneconfig-worker",
+        description="Runs experiment tasks served by a DistributedExecutor.")
+    parser.add_argument(
+        "--address", default=f"localhost:{DEFAULT_PORT}",
+        help="coordinator address as host:port")
+    parser.add_argument(
+        "--authkey", default=None,
+        help=f"coordinator authentication key (default: ${AUTHKEY_ENV})")
+    parser.add_argument(
+        "--num-workers", type=int, default=1,
+        help="number of worker processes")
+    parser.add_argument(
+        "--path", action="append", default=[],
+        help="directory added to sys.path to import trial runner functions")
+    parser.add_argument(
+        "--timeout", type=float, default=60.0,
+        help="seconds to wait for the coordinator")
+    args = parser.parse_args(argv)
+
+    sys.path[:0] = args.path
+    address = parse_address(args.address)
+
+    if args.num_workers == 1:
+        run_worker(address, args.authkey, args.timeout)
+        return
+
+    workers = [
+        mp.Process(target=run_worker, args=(address, args.authkey, args.timeout))
+        for _ in range(args.num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb(x, y, max_points):
+    """
+    Returns the indices of at most `max_points` points of the (x, y) curve
+    selected by the Largest-Triangle-Three-Buckets algorithm.
+
+    The first and last points are kept, and the others are split into
+    `max_points - 2` buckets. In each bucket, the point forming the largest
+    triangle with the point selected in the previous bucket and the average
+    of the next bucket is selected. Areas are computed with array
+    operations, one bucket at a time.
+    """
+    num_points = len(y)
+    if max_points >= num_points or max_points < 3:
+        return np.arange(num_points)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    edges = np.linspace(1, num_points - 1, max_points - 1).astype(np.int64)
+
+    indices = np.empty(max_points, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = num_points - 1
+
+    a = 0
+    for k in range(max_points - 2):
+        start, end = edges[k], edges[k + 1]
+        next_start, next_end = end, edges[k + 2] if k + 2 < len(edges) else num_points
+        next_end = max(next_end, next_start + 1)
+
+        cx = np.nanmean(x[next_start:next_end])
+        cy = np.nanmean(y[next_start:next_end])
+
+        areas = np.abs(
+            (x[a] - cx) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (cy - y[a]))
+        a = start + int(np.argmax(np.nan_to_num(areas, nan=-1.0)))
+        indices[k + 1] = a
+
+    return indices
+
+
+def minmax(x, y, max_points):
+    """
+    Returns the indices of at most `max_points` points of the (x, y) curve
+    keeping the minimum and maximum of each of `max_points // 2` buckets.
+    """
+    num_points = len(y)
+    if max_points >= num_points or max_points < 2:
+        return np.arange(num_points)
+
+    y = np.asarray(y, dtype=float)
+    num_buckets = max_points // 2
+    edges = np.linspace(0, num_points, num_buckets + 1).astype(np.int64)
+    widths = np.diff(edges)
+
+    # Buckets are laid out as the rows of a (buckets, max width) matrix of
+    # indices, where padding (and NaNs) are ignored by the reductions.
+    indices = edges[:-1, None] + np.arange(widths.max())
+    valid = np.arange(widths.max()) < widths[:, None]
+    values = y[np.minimum(indices, num_points - 1)]
+    valid &= ~np.isnan(values)
+
+    rows = np.arange(num_buckets)
+    argmin = indices[rows, np.where(valid, values, np.inf).argmin(axis=1)]
+    argmax = indices[rows, np.where(valid, values, -np.inf).argmax(axis=1)]
+
+    return np.unique(np.concatenate([argmin, argmax]))
+
+
+DOWNSAMPLERS = {
+    "lttb": lttb,
+    "minmax": minmax,
+}
+
+
+def downsample(df, max_points, method="lttb", column=None):
+    """
+    Returns the rows of `df` selected by decimating its `column`, or `df` if
+    it has at most `max_points` rows.
+
+    Args:
+        df (pd.DataFrame): The curve indexed by step.
+        max_points (int): The maximum number of rows.
+        method (str): Either 'lttb' or 'minmax'.
+        column (str): (optional) The decimated column, by default 'center'
+            (aggregator bands), 'mean' (stats) or the first one.
+    """
+    if method not in DOWNSAMPLERS:
+        raise ValueError(f"Invalid downsampling method '{method}'.")
+
+    if len(df) <= max_points:
+        return df
+
+    if column is None:
+        column = next((col for col in ["center", "mean"] if col in df), df.columns[0])
+
+    x = df.index.to_numpy() if pd.api.types.is_numeric_dtype(df.index) else np.arange(len(df))
+    indices = DOWNSAMPLERS[method](x, df[column].to_numpy(), max_points)
+    return df.iloc[indices]
@@ -0,0 +1,164 @@
+import asyncio
+import concurrent.futures
+import os
+import sys
+import threading
+
+from tqdm import tqdm
+
+
+class Executor:
+    """Base class of the concurrency backends used to run trial runner functions.
+
+    Backends return a `concurrent.futures.Future` for each submitted call
+    and are shut down when used as context managers.
+
+    Args:
+        num_workers (int): (optional) maximum number of concurrent calls.
+    """
+
+    def __init__(self, num_workers=None):
+        self.num_workers = num_workers
+
+    def submit(self, fn, *args):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+    def map_unordered(self, fn, iterable):
+        """
+        Applies `fn` to every item and yields (index, result) pairs as they complete.
+
+        At most `2 * num_workers` calls are in flight at any time.
+        """
+        max_in_flight = 2 * (self.num_workers or 1)
+        items = enumerate(iterable)
+        running = {}
+
+        while True:
+            for i, item in items:
+                running[self.submit(fn, item)] = i
+                if len(running) >= max_in_flight:
+                    break
+
+            if not running:
+                break
+
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                yield running.pop(future), future.result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+class ProcessExecutor(Executor):
+    def __init__(self, num_workers=None):
+        super().__init__(num_workers or os.cpu_count())
+
+        # Workers share the tqdm lock of this process. ProcessPoolExecutor only
+        # takes an initializer from Python 3.7, before which workers forked
+        # from this process inherit the lock created here.
+        lock = tqdm.get_lock()
+        kwargs = {}
+        if sys.version_info >= (3, 7):
+            kwargs = {"initializer": tqdm.set_lock, "initargs": (lock,)}
+        self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.num_workers, **kwargs)
+
+    def submit(self, fn, *args):
+        return self._pool.submit(fn, *args)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+class ThreadExecutor(Executor):
+    def __init__(self, num_workers=None):
+        super().__init__(num_workers or min(32, os.cpu_count() + 4))
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.num_workers)
+
+    def submit(self, fn, *args):
+        return self._pool.submit(fn, *args)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+class SerialExecutor(Executor):
+    """Runs every call in the calling process, which is handy for debugging."""
+
+    def __init__(self, num_workers=None):
+        super().__init__(1)
+
+    def submit(self, fn, *args):
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as error:  # pylint: disable=broad-except
+            future.set_exception(error)
+        return future
+
+
+class AsyncioExecutor(Executor):
+    """Runs `async def` functions concurrently on an event loop in a background thread.
+
+    Regular functions are run in a thread pool owned by the executor.
+    """
+
+    DEFAULT_NUM_WORKERS = 64
+
+    def __init__(self, num_workers=None):
+        super().__init__(num_workers or self.DEFAULT_NUM_WORKERS)
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.num_workers)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+        self._semaphore = asyncio.run_coroutine_threadsafe(
+            self._make_semaphore(self.num_workers), self._loop).result()
+
+    @staticmethod
+    async def _make_semaphore(num_workers):
+        return asyncio.Semaphore(num_workers)
+
+    async def _call(self, fn, *args):
+        async with self._semaphore:
+            return await self._run(fn, *args)
+
+    async def _run(self, fn, *args):
+        if asyncio.iscoroutinefunction(fn):
+            return await fn(*args)
+        return await self._loop.run_in_executor(self._pool, fn, *args)
+
+    def submit(self, fn, *args):
+        return asyncio.run_coroutine_threadsafe(self._call(fn, *args), self._loop)
+
+    def shutdown(self):
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._pool.shutdown(wait=True)
+        self._loop.close()
+
+
+EXECUTORS = {
+    "process": ProcessExecutor,
+    "thread": ThreadExecutor,
+    "asyncio": AsyncioExecutor,
+    "serial": SerialExecutor,
+}
+
+
+def get_executor(executor="process", num_workers=None):
+    """Returns the `executor` instance or builds the backend with the given name."""
+    if isinstance(executor, Executor):
+        return executor
+    if executor not in EXECUTORS:
+        raise ValueError(f"Invalid executor '{executor}'.")
+    return EXECUTORS[executor](num_workers)
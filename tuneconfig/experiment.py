@@ -1,12 +1,16 @@
+import concurrent.futures
 import contextlib
 import enum
 import itertools
-import multiprocessing as mp
+import json
 import os
 import re
 import shutil
+import statistics
 
-from tqdm import tqdm, trange
+from tqdm import trange
+
+from tuneconfig.executor import Executor, get_executor
 
 
 @enum.unique
@@ -16,12 +20,77 @@ class ExperimentMode(enum.Enum):
     OVERWRITE = 2
 
 
+class ManifestReader:
+    """Incremental reader of an experiment manifest.
+
+    The reader keeps the byte offset of the last complete record it parsed,
+    so that `read` only parses records appended to the file since then.
+    If the file was truncated or replaced by a smaller one, it is read again
+    from the start.
+
+    Args:
+        filepath (str): The path of the manifest file.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._trials = {}
+        self._offset = 0
+
+    def read(self):
+        """
+        Returns the trials recorded in the manifest, or None if there is no manifest.
+
+        Returns:
+            Dict[str, Dict]: The config and run directories indexed by trial directory.
+        """
+        if not os.path.exists(self.filepath):
+            self._trials = {}
+            self._offset = 0
+            return None
+
+        size = os.stat(self.filepath).st_size
+        if size < self._offset:
+            self._trials = {}
+            self._offset = 0
+
+        if size > self._offset:
+            with open(self.filepath, "rb") as file:
+                file.seek(self._offset)
+                data = file.read()
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                self._parse(json.loads(line))
+            self._offset += end
+
+        return {
+            trial_dir: {"config": trial["config"], "run_dirs": list(trial["run_dirs"])}
+            for trial_dir, trial in self._trials.items()
+            if trial["config"] is not None
+        }
+
+    def _parse(self, record):
+        logdir = os.path.dirname(self.filepath)
+        trial_dir = os.path.join(logdir, record["trial_id"])
+        trial = self._trials.setdefault(trial_dir, {"config": None, "run_dirs": {}})
+
+        if record["event"] == "trial":
+            trial["config"] = record["config"]
+        elif record["event"] == "run":
+            run_dir = os.path.join(trial_dir, f"run{record['run_id']}")
+            trial["run_dirs"][run_dir] = None
+        elif record["event"] == "reset":
+            trial["run_dirs"].clear()
+
+
 class Experiment:
     """
     Experiment -> trials -> runs.
     """
 
     CONFIG_FILE = "config.json"
+    MANIFEST_FILE = "manifest.jsonl"
+    RUNGS_FILE = "rungs.csv"
     RUN_DIR_REGEX = r"run\d+$"
 
     def __init__(self, config_iterator, logdir, name=None, description=None):
@@ -33,26 +102,79 @@ class Experiment:
     def start(self):
         config_files = self.config_iterator.dump(self.logdir)
 
-    def run(self, exec_func, num_samples, num_workers=None, mode=ExperimentMode.APPEND, verbose=False):
+        manifest = self.read_manifest(self.logdir) or {}
+        records = []
+        for config in self.config_iterator:
+            records.extend(self._get_trial_records(config, manifest))
+        self._append_manifest(records)
+
+    def run(self, exec_func, num_samples, num_workers=None, mode=ExperimentMode.APPEND, verbose=False, scheduler=None, executor="process"):
         """
         Executes the trial runner function a given number of times.
 
         Args:
             exec_func (Callable[Dict] -> Result): The trial runner function.
             num_samples (int): The number of runs per trial.
-            num_workers (int): The number of worker processes.
+            num_workers (int): The number of concurrent workers.
+            scheduler (ASHAScheduler): (optional) early-stopping scheduler of the
+                trials, ranked on the mean score of their runs. All runs of a
+                promoted trial are re-executed from scratch in the same run
+                `logdir` with the budget of the next rung, after removing the
+                result files of the previous rung (but `rungs.csv`).
+            executor (Union[str, Executor]): The concurrency backend, either an
+                Executor or one of 'process', 'thread', 'asyncio' or 'serial'.
         """
-        results = {}
+        # pylint: disable=too-many-arguments
+        tasks = self._get_tasks(num_samples, mode, verbose)
+
+        owned = not isinstance(executor, Executor)
+        executor = get_executor(executor, num_workers)
+
+        try:
+            if scheduler is not None:
+                return self._run_scheduled(exec_func, tasks, executor, scheduler)
+            return self._run_all(exec_func, tasks, executor)
+        finally:
+            if owned:
+                executor.shutdown()
+
+    def _run_all(self, exec_func, tasks, executor):
+        results = {
+            trial_id: [None] * len(trial_configs)
+            for trial_id, trial_configs in tasks.items()
+        }
+
+        # All runs of all trials are fed to a single executor, so that runs
+        # of different trials overlap and every worker stays busy.
+        jobs = [
+            (trial_id, k)
+            for trial_id, trial_configs in tasks.items()
+            for k in range(len(trial_configs))
+        ]
+        run_configs = (tasks[trial_id][k] for trial_id, k in jobs)
 
+        for i, result in executor.map_unordered(exec_func, run_configs):
+            trial_id, k = jobs[i]
+            results[trial_id][k] = result
+
+        return results
+
+    def _get_tasks(self, num_samples, mode, verbose):
+        tasks = {}
+        records = []
+
+        manifest = self.read_manifest(self.logdir) or {}
         total_num_trials = len(self.config_iterator)
 
         for i, config in enumerate(self.config_iterator):
             trial_id, trial_dir = self._get_trial(config)
+            records.extend(self._get_trial_records(config, manifest))
 
             info = ""
             skip = False
             if mode == ExperimentMode.OVERWRITE:
                 self.remove_old_runs(trial_dir)
+                records.append({"event": "reset", "trial_id": trial_id})
                 info = "[OVERWRITTEN]"
             elif mode == ExperimentMode.SKIP and self.has_old_runs(trial_dir):
                 skip = True
@@ -68,7 +190,7 @@ class Experiment:
             range_num_samples = self._get_run_ids(trial_dir, num_samples)
 
             trial_configs = []
-            for i, j in enumerate(range_num_samples):
+            for j in range_num_samples:
                 logdir = os.path.join(trial_dir, f"run{j}")
                 if not os.path.exists(logdir):
                     os.makedirs(logdir)
@@ -78,18 +200,79 @@ class Experiment:
                     "run_id": j,
                     "logdir": logdir,
                 })
+                records.append({"event": "run", "trial_id": trial_id, "run_id": j})
 
-            pool = mp.Pool(
-                processes=num_workers,
-                initializer=tqdm.set_lock,
-                initargs=(tqdm.get_lock(),)
-            )
-            results[trial_id] = pool.map(exec_func, trial_configs)
-            pool.close()
-            pool.join()
+            tasks[trial_id] = trial_configs
+
+        self._append_manifest(records)
+
+        return tasks
+
+    def _run_scheduled(self, exec_func, tasks, executor, scheduler):
+        # Each trial is a candidate of the scheduler, which decides which
+        # trial runs next and with which budget. All runs of a trial are
+        # executed at each rung, and the trial is ranked on their mean score.
+        candidates = list(tasks)
+        scheduler.reset(len(candidates))
+
+        results = {
+            trial_id: [None] * len(trial_configs)
+            for trial_id, trial_configs in tasks.items()
+        }
+
+        running = {}
+        scores = {}
+
+        while True:
+            while len(running) < executor.num_workers:
+                job = scheduler.next_job()
+                if job is None:
+                    break
+
+                candidate, rung = job
+                trial_configs = tasks[candidates[candidate]]
+                scores[job] = [None] * len(trial_configs)
+                for k, run_config in enumerate(trial_configs):
+                    if rung > 0:
+                        self.remove_results(run_config["logdir"])
+                    run_config = {
+                        **run_config,
+                        scheduler.budget_key: scheduler.budget(candidate, rung),
+                    }
+                    running[executor.submit(exec_func, run_config)] = (job, k)
+
+            if not running:
+                break
+
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                job, k = running.pop(future)
+                candidate, rung = job
+                result = future.result()
+
+                trial_id = candidates[candidate]
+                results[trial_id][k] = result
+                scores[job][k] = scheduler.score(result)
+
+                self._log_rung(
+                    tasks[trial_id][k]["logdir"], rung, scheduler.budget(candidate, rung), scores[job][k])
+
+                if all(score is not None for score in scores[job]):
+                    scheduler.report_score(candidate, rung, statistics.mean(scores.pop(job)))
 
         return results
 
+    @classmethod
+    def _log_rung(cls, logdir, rung, budget, score):
+        filepath = os.path.join(logdir, cls.RUNGS_FILE)
+        write_header = not os.path.exists(filepath)
+        with open(filepath, "a") as file:
+            if write_header:
+                file.write("rung,budget,score\n")
+            file.write(f"{rung},{budget},{score}\n")
+
     @classmethod
     @contextlib.contextmanager
     def trange(cls, epochs, run_id, num_workers, unit="epoch", desc=None, show_progress=True):
@@ -121,11 +304,66 @@ class Experiment:
             if cls.is_run_dir(f.path)
         ]
 
+    @classmethod
+    def get_run_id(cls, run_dir):
+        return int(re.search(r"\d+$", run_dir).group())
+
+    @classmethod
+    def remove_results(cls, run_dir):
+        """Removes the result files of `run_dir` (and their sidecars), but the rungs of the scheduler."""
+        results = [
+            path for path in os.listdir(run_dir)
+            if path.endswith(".csv") and path != cls.RUNGS_FILE
+        ]
+        for path in os.listdir(run_dir):
+            if any(path == result or path.startswith(result + ".") for result in results):
+                os.remove(os.path.join(run_dir, path))
+
     @classmethod
     def remove_old_runs(cls, trial_dir):
         for path in cls.get_run_dirs(trial_dir):
             shutil.rmtree(path)
 
+    def _append_manifest(self, records):
+        if not records:
+            return
+
+        if not os.path.exists(self.logdir):
+            os.makedirs(self.logdir)
+
+        # Records are written with a single append, so that experiments
+        # sharing a logdir (e.g., shards) do not interleave partial lines.
+        lines = "".join(json.dumps(record) + "\n" for record in records)
+        with open(os.path.join(self.logdir, self.MANIFEST_FILE), "a") as file:
+            file.write(lines)
+
+    @classmethod
+    def read_manifest(cls, logdir):
+        """
+        Returns the trials recorded in the manifest of `logdir`, or None if it has none.
+
+        Returns:
+            Dict[str, Dict]: The config and run directories indexed by trial directory.
+        """
+        return ManifestReader(os.path.join(logdir, cls.MANIFEST_FILE)).read()
+
+    def _get_trial_records(self, config, manifest):
+        # Trials missing from the manifest (e.g., of logdirs written by older
+        # versions) are recorded along with the runs they already have, so
+        # that these runs are still loaded once the trial is in the manifest.
+        trial_id, trial_dir = self._get_trial(config)
+        if trial_dir in manifest:
+            return []
+
+        manifest[trial_dir] = {"config": config, "run_dirs": []}
+        records = [{"event": "trial", "trial_id": trial_id, "config": config}]
+        if os.path.isdir(trial_dir):
+            records.extend(
+                {"event": "run", "trial_id": trial_id, "run_id": run_id}
+                for run_id in sorted(self.get_run_id(run_dir) for run_dir in self.get_run_dirs(trial_dir))
+            )
+        return records
+
     def _get_trial(self, config):
         trial_id = self.config_iterator._trial_id(config)
         trial_dir = os.path.join(self.logdir, trial_id)
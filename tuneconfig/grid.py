@@ -1,72 +1,66 @@
 from collections import defaultdict
 import os
-import re
 
 from tuneconfig.analysis import ExperimentAnalysis
 
 
-def _get_trial_id(commonconfig, x, y, trial_name):
-    param_values = set(commonconfig) | set([x, y])
-    param_values = filter(None, param_values)
-    trial_id = trial_name
-    for param_value in param_values:
-        trial_id = trial_id.replace(str(param_value), "")
-    trial_id = re.sub(r"/{2,}", "/", trial_id)
-    if trial_id.startswith("/"):
-        trial_id = trial_id[1:]
-    if trial_id.endswith("/"):
-        trial_id = trial_id[:-1]
-    return trial_id
-
-
-def _get_commonconfig(plots):
-    commonconfig = set(filter(None, plots[0][1].split("/")))
-    for _, trial_name, _, _ in plots[1:]:
-        commonconfig &= set(trial_name.split("/"))
+def _get_components(analysis_logdir, dirname):
+    path = os.path.relpath(dirname, analysis_logdir)
+    return tuple(component for component in path.split(os.sep) if component not in ("", "."))
+
+
+def _get_trial_id(commonconfig, x, y, components):
+    excluded = set(commonconfig)
+    excluded.update(label for _, label in filter(None, [x, y]))
+    return "/".join(component for component in components if component not in excluded)
+
+
+def _get_commonconfig(components):
+    commonconfig = set(components[0])
+    for trial_components in components[1:]:
+        commonconfig &= set(trial_components)
     return sorted(commonconfig)
 
 
-def _get_metrics(trial, targets, aggregate):
+def _get_metrics(trial, targets, aggregate, max_points=None, downsample="lttb"):
     return {
-        target: ExperimentAnalysis.get_data(trial, target, aggregate)
+        target: ExperimentAnalysis.get_data(trial, target, aggregate, max_points, downsample)
         for target in targets
     }
 
 
+def _sort_grid_key(key):
+    if not key:
+        return key
+    return key[0]
+
+
 class TrialGridCell:
-    def __init__(self, x, y, plots):
+    """A cell of the grid with the ids of its analyses, trials and metrics.
+
+    Args:
+        x (Optional[Tuple[Any, str]]): The x-axis value and label of the cell.
+        y (Optional[Tuple[Any, str]]): The y-axis value and label of the cell.
+        plots (List[Tuple]): The (analysis_id, trial_id, trial) entries of the cell.
+        targets (List[str]): The plotted targets.
+    """
+
+    def __init__(self, x, y, plots, targets):
         self.x = x
         self.y = y
 
         self.plots = plots
-        self.analyses = set()
-        self.trials = set()
-        self.metrics = set()
+        self.analyses = sorted({analysis_id for analysis_id, _, _ in plots})
+        self.trials = sorted({trial_id for _, trial_id, _ in plots})
+        self.metrics = sorted(targets)
 
         self._idx = {}
-        self._build_idx()
-
-    def _build_idx(self):
-        prefix = os.path.commonpath([x[0] for x in self.plots])
-        commonconfig = _get_commonconfig(self.plots)
-
         idx = 0
-        for analysis_logdir, trial_name, trial, metrics in self.plots:
-            analysis_id = analysis_logdir.replace(prefix, "")[1:]
-            self.analyses.add(analysis_id)
-
-            trial_id = _get_trial_id(commonconfig, self.x, self.y, trial_name)
-            self.trials.add(trial_id)
-
-            for metric in metrics:
-                self.metrics.add(metric)
+        for analysis_id, trial_id, _ in plots:
+            for metric in targets:
                 self._idx[(analysis_id, trial_id, metric)] = idx
                 idx += 1
 
-        self.analyses = sorted(self.analyses)
-        self.trials = sorted(self.trials)
-        self.metric = sorted(self.metrics)
-
     def __len__(self):
         return len(self.plots) * len(self.metrics)
 
@@ -75,10 +69,22 @@ class TrialGridCell:
 
 
 class TrialGrid:
+    """TrialGrid lays out the selected trials of several analyses in a grid
+    of cells indexed by the values of the `y_axis` and `x_axis` params.
+
+    The layout (cell positions, common configs and label ids) only depends
+    on the selected trial directories and the axes, so it is computed once
+    and reused by later builds (e.g., when only the plot style changes). It
+    refers to trials by directory: each build reads the data of the targets
+    from the currently selected Trial objects, e.g., after a setup or refresh.
+    """
+
     def __init__(self, analysis, *analyses):
         self.analyses = [analysis, *analyses]
 
         self._cell_idx = {}
+        self._layout_key = None
+        self._layout = None
 
     def select(self, anchors):
         self._trials = {
@@ -87,79 +93,84 @@ class TrialGrid:
         }
         return self
 
-    def build(self, targets, x_axis=None, y_axis=None, aggregate=True):
+    def build(self, targets, x_axis=None, y_axis=None, aggregate=True, max_points=None, downsample="lttb"):
+        # pylint: disable=too-many-arguments
         self.x_axis = x_axis
         self.y_axis = y_axis
 
+        key = (x_axis, y_axis, tuple((logdir, tuple(trials)) for logdir, trials in self._trials.items()))
+        if key != self._layout_key:
+            self._layout = self._build_layout(x_axis, y_axis)
+            self._layout_key = key
+
         self._grid = defaultdict(lambda: defaultdict(list))
+        self._cell_idx = {}
+        self._entries = []
+
+        for j, i, y, x, commonconfig, plots in self._layout["cells"]:
+            for analysis_id, trial_id, name, analysis_logdir, dirname in plots:
+                trial = self._trials[analysis_logdir][dirname]
+                metrics = _get_metrics(trial, targets, aggregate, max_points, downsample)
+                self._grid[y][x].append((analysis_logdir, name, trial, metrics))
+
+                for metric, df in metrics.items():
+                    self._entries.append(
+                        ((j, i, y, x, commonconfig), (analysis_id, trial_id, metric), df))
 
-        for analysis_id, trials in self._trials.items():
-            for name, trial in trials.items():
-                name = name.replace(analysis_id, "")
-                metrics = _get_metrics(trial, targets, aggregate)
+            cell_plots = [
+                (analysis_id, trial_id, self._trials[analysis_logdir][dirname])
+                for analysis_id, trial_id, _, analysis_logdir, dirname in plots
+            ]
+            self._cell_idx[(y, x)] = TrialGridCell(x, y, cell_plots, targets)
 
+        return self._grid
+
+    def _build_layout(self, x_axis, y_axis):
+        cells = defaultdict(lambda: defaultdict(list))
+
+        for analysis_logdir, trials in self._trials.items():
+            for dirname, trial in trials.items():
                 x_id = None
                 if x_axis:
                     x = trial.config.get(x_axis)
-                    x_label = f"{x_axis}={x}"
-                    x_id = (x, x_label)
+                    x_id = (x, f"{x_axis}={x}")
 
                 y_id = None
                 if y_axis:
                     y = trial.config.get(y_axis)
-                    y_label = f"{y_axis}={y}" if y_axis else None
-                    y_id = (y, y_label)
-
-                self._grid[y_id][x_id].append(
-                    (analysis_id, name, trial, metrics))
-
-        self._build_cell_index()
-
-        return self._grid
-
-    def _build_cell_index(self):
-        for j, y in enumerate(self._grid):
-            for i, x in enumerate(self._grid[y]):
-                plots = self._grid[y][x]
-                self._cell_idx[(y, x)] = TrialGridCell(x, y, plots)
-
-    def traverse(self):
-        def sort_grid_key(key):
-            if not key:
-                return key
-            return key[0]
+                    y_id = (y, f"{y_axis}={y}")
 
-        y_values = sorted(self._grid, key=sort_grid_key)
+                components = _get_components(analysis_logdir, dirname)
+                cells[y_id][x_id].append((analysis_logdir, dirname, components))
 
+        layout = []
+        x_values = set()
+        y_values = sorted(cells, key=_sort_grid_key)
         for j, y in enumerate(y_values):
-            x_values = sorted(self._grid[y], key=sort_grid_key)
-
-            for i, x in enumerate(x_values):
-                plots = self._grid[y][x]
+            for i, x in enumerate(sorted(cells[y], key=_sort_grid_key)):
+                x_values.add(x)
+                entries = cells[y][x]
 
-                prefix = os.path.commonpath([x[0] for x in plots])
-                commonconfig = _get_commonconfig(plots)
+                prefix = os.path.commonpath([logdir for logdir, _, _ in entries])
+                commonconfig = _get_commonconfig([components for _, _, components in entries])
 
-                for analysis_logdir, trial_name, trial, metrics in plots:
+                plots = []
+                for analysis_logdir, dirname, components in entries:
                     analysis_id = analysis_logdir.replace(prefix, "")[1:]
-                    trial_id = _get_trial_id(commonconfig, x, y, trial_name)
+                    trial_id = _get_trial_id(commonconfig, x, y, components)
+                    name = dirname.replace(analysis_logdir, "")
+                    plots.append((analysis_id, trial_id, name, analysis_logdir, dirname))
 
-                    for metric, df in metrics.items():
-                        yield (
-                            (j, i, y, x, commonconfig),
-                            (analysis_id, trial_id, metric),
-                            df,
-                        )
+                layout.append((j, i, y, x, commonconfig, plots))
+
+        return {"cells": layout, "shape": (len(y_values), len(x_values))}
+
+    def traverse(self):
+        return iter(self._entries)
 
     def get(self, x, y):
         return self._cell_idx[(y, x)]
 
     @property
     def shape(self):
-        y_values = self._grid.keys()
-
-        x_values = set()
-        for values in self._grid.values():
-            x_values.update(set(values.keys()))
-
-        return (len(y_values), len(x_values))
+        return self._layout["shape"]
@@ -9,13 +9,20 @@ def run_experiment(exec_func,
                    num_workers=1,
                    mode=ExperimentMode.APPEND,
                    name=None,
+                   ignore=None,
+                   scheduler=None,
+                   executor="process",
                    verbose=True):
     # pylint: disable=too-many-arguments
 
+    if ignore:
+        config_factory = config_factory.exclude(ignore)
+
     experiment = Experiment(config_factory, logdir)
     experiment.start()
     experiment.run(
-        exec_func, num_samples, num_workers, mode=mode, verbose=verbose)
+        exec_func, num_samples, num_workers,
+        mode=mode, verbose=verbose, scheduler=scheduler, executor=executor)
 
     analysis = ExperimentAnalysis(logdir, name=name)
     analysis.setup()
@@ -0,0 +1,140 @@
+import csv
+import io
+import os
+import time
+
+
+class RunLogger:
+    """Buffered CSV logger of the results of a run.
+
+    Rows of each result are buffered in memory and appended to
+    `<logdir>/<result>.csv` in batches, which is the layout read by
+    `Trial.from_directory`. Rows are written when a result has `flush_every`
+    buffered rows, when a row is logged `flush_interval` seconds after the
+    last write, or on `close`, and synced to disk if `fsync` is set. When
+    reopening an existing file (e.g., after a crash), a truncated last line
+    is discarded and new rows are appended after the last complete one.
+
+    Args:
+        logdir (str): The run directory, usually `config["logdir"]`.
+        flush_every (int): The maximum number of buffered rows per result.
+        flush_interval (float): The maximum number of seconds between writes.
+        fsync (bool): Whether to sync each batch to disk.
+        float_format (str): (optional) The format of float values, e.g. '%.6g'.
+    """
+
+    def __init__(self, logdir, flush_every=100, flush_interval=10.0, fsync=True, float_format=None):
+        # pylint: disable=too-many-arguments
+        self.logdir = logdir
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.float_format = float_format
+
+        self._columns = {}
+        self._buffers = {}
+        self._last_flush = time.monotonic()
+
+        if not os.path.exists(logdir):
+            os.makedirs(logdir)
+
+    def get_filepath(self, result):
+        return os.path.join(self.logdir, f"{result}.csv")
+
+    def log(self, metrics, result="data"):
+        """
+        Buffers a row of `metrics` of the given `result`.
+
+        The columns of a result are fixed by its first row (or by the header
+        of an existing file), and every row must have the same keys.
+
+        Args:
+            metrics (Dict[str, Any]): The metric values indexed by name.
+            result (str): The result name.
+        """
+        if result not in self._columns:
+            self._columns[result] = self._open(result, list(metrics))
+            self._buffers[result] = []
+
+        columns = self._columns[result]
+        if set(metrics) != set(columns):
+            raise ValueError(
+                f"Invalid metrics {sorted(metrics)} for result '{result}' with columns {columns}.")
+
+        self._buffers[result].append([self._format(metrics[col]) for col in columns])
+
+        if (len(self._buffers[result]) >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Appends the buffered rows of all results to their files."""
+        for result, rows in self._buffers.items():
+            if rows:
+                self._append(result, rows)
+                rows.clear()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+
+    def _open(self, result, columns):
+        filepath = self.get_filepath(result)
+
+        if os.path.exists(filepath):
+            self._truncate_partial_line(filepath)
+            with open(filepath, "r", newline="") as file:
+                header = next(csv.reader(file), None)
+            if header:
+                return header
+
+        self._write(filepath, [columns], mode="w")
+        return columns
+
+    @staticmethod
+    def _truncate_partial_line(filepath):
+        with open(filepath, "rb+") as file:
+            size = file.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+
+            file.seek(size - 1)
+            if file.read(1) == b"\n":
+                return
+
+            # Scans backwards for the end of the last complete line.
+            position = size
+            while position > 0:
+                start = max(0, position - io.DEFAULT_BUFFER_SIZE)
+                file.seek(start)
+                index = file.read(position - start).rfind(b"\n")
+                if index >= 0:
+                    file.truncate(start + index + 1)
+                    return
+                position = start
+
+            file.truncate(0)
+
+    def _append(self, result, rows):
+        self._write(self.get_filepath(result), rows, mode="a")
+
+    def _write(self, filepath, rows, mode):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+
+        with open(filepath, mode, newline="") as file:
+            file.write(buffer.getvalue())
+            if self.fsync:
+                file.flush()
+                os.fsync(file.fileno())
+
+    def _format(self, value):
+        if self.float_format is not None and isinstance(value, float):
+            return self.float_format % value
+        return value
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
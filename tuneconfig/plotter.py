@@ -1,23 +1,44 @@
+import argparse
 import os
 import json
+import multiprocessing as mp
 import re
 
 import matplotlib.pyplot as plt
 
+from tuneconfig.analysis import ExperimentAnalysis
+from tuneconfig.executor import Executor, ProcessExecutor, SerialExecutor, get_executor
 from tuneconfig.grid import TrialGrid
 
 
-plt.style.use("seaborn-darkgrid")
+# The default style, named 'seaborn-darkgrid' before matplotlib 3.6.
+STYLES = ["seaborn-v0_8-darkgrid", "seaborn-darkgrid"]
+
+
+def get_style(style=None):
+    """Returns the given `style` or the first available default style."""
+    if style is not None:
+        return style
+    return next((name for name in STYLES if name in plt.style.available), "default")
 
 
 class ExperimentPlotter:
     """ExperimentPlotter manages plotting for multiple experiment analyses.
 
+    Line plots of long curves can be decimated to at most `max_points`
+    points per curve with the `downsample` method ('lttb' or 'minmax'),
+    given either as keyword arguments of the plotter or of `plot`. Figures
+    are drawn with the matplotlib `style` keyword argument (by default,
+    seaborn's darkgrid), which is only applied while plotting.
+
     Args:
         analysis (ExperimentAnalysis): (required) analysis object.
         analyses (List(ExperimentAnalysis)): (optional) list of analysis objects.
     """
 
+    # The backends of `render_specs`, whose tasks do not share a process.
+    EXECUTORS = ["process", "serial"]
+
     def __init__(self, analysis, *analyses, **kwargs):
         self.analyses = [analysis, *analyses]
         self.grid = TrialGrid(*self.analyses)
@@ -27,8 +48,16 @@ class ExperimentPlotter:
         fmt_kwargs = self.kwargs.copy()
         fmt_kwargs.update(kwargs)
 
-        aggregate = kwargs.get("aggregate", True)
-        trial_grid = self.grid.select(anchors).build(targets, x_axis, y_axis, aggregate)
+        with plt.style.context(get_style(fmt_kwargs.get("style"))):
+            return self._plot_figure(
+                targets, x_axis, y_axis, anchors, kwargs.get("aggregate", True), fmt_kwargs)
+
+    def _plot_figure(self, targets, x_axis, y_axis, anchors, aggregate, fmt_kwargs):
+        # pylint: disable=too-many-arguments
+        trial_grid = self.grid.select(anchors).build(
+            targets, x_axis, y_axis, aggregate,
+            max_points=fmt_kwargs.get("max_points"),
+            downsample=fmt_kwargs.get("downsample", "lttb"))
 
         nrows, ncols = self.grid.shape
         fig, axes = plt.subplots(
@@ -77,13 +106,18 @@ class ExperimentPlotter:
         plot_fn = getattr(self, f"_plot_{plot_type}")
         plot_fn(ax, df, label, index, **kwargs)
 
-    def _plot_line(self, ax, df, label, index, **kwargs):
+    @staticmethod
+    def _get_band(df):
+        if "center" in df:
+            return df["center"], df["lower"], df["upper"]
         mean, std = df["mean"], df["std"]
-        lower = mean - std
-        upper = mean + std
+        return mean, mean - std, mean + std
 
-        xs = range(len(mean))
-        ax.plot(xs, mean, label=label)
+    def _plot_line(self, ax, df, label, index, **kwargs):
+        center, lower, upper = self._get_band(df)
+
+        xs = center.index
+        ax.plot(xs, center, label=label)
         ax.fill_between(xs, lower, upper, alpha=0.25)
         ax.set_xscale(kwargs.get("xscale", "linear"))
         ax.set_yscale(kwargs.get("yscale", "linear"))
@@ -91,10 +125,11 @@ class ExperimentPlotter:
         ax.legend()
 
     def _plot_bar(self, ax, df, label, index, **kwargs):
-        mean, std = df["mean"], df["std"]
+        center, lower, upper = self._get_band(df)
+        yerr = [[center - lower], [upper - center]]
         x = index * 0.5
         width = 0.35
-        ax.bar([x], mean, width, yerr=std, capsize=10, label=label, alpha=0.45)
+        ax.bar([x], center, width, yerr=yerr, capsize=10, label=label, alpha=0.45)
         ax.set_xticklabels([])
         ax.legend()
 
@@ -119,3 +154,141 @@ class ExperimentPlotter:
             fig.savefig(filename)
         if show_fig:
             plt.show()
+        return fig
+
+    def render_specs(self, spec_paths, outdir=None, fmt="png", num_workers=None, executor="process"):
+        """
+        Renders the charts of many JSON spec files and saves them to disk.
+
+        Specs are rendered by a pool of workers on the headless Agg backend.
+        Forked workers share the loaded analyses of the plotter, while
+        spawned workers set them up again from their logdir (and snapshot).
+
+        Args:
+            spec_paths (List[str]): The paths of the JSON spec files.
+            outdir (str): (optional) The output directory, by default the directory of each spec.
+            fmt (str): The output format, e.g. 'png' or 'pdf'.
+            num_workers (int): (optional) The number of workers.
+            executor (Union[str, Executor]): Either 'process' or 'serial', or an instance
+                of these backends. Tasks share the plotter and pyplot's global state,
+                so thread-based backends are not supported.
+
+        Returns:
+            List[str]: The paths of the saved figures, in the order of `spec_paths`.
+        """
+        # pylint: disable=too-many-arguments
+        global _PLOTTER  # pylint: disable=global-statement
+
+        if executor not in self.EXECUTORS and not isinstance(executor, (ProcessExecutor, SerialExecutor)):
+            raise ValueError(f"Invalid executor '{executor}' for rendering specs.")
+
+        state = self._get_state()
+        tasks = []
+        for spec_path in spec_paths:
+            basename = os.path.splitext(os.path.basename(spec_path))[0]
+            dirname = outdir if outdir is not None else os.path.dirname(spec_path)
+            tasks.append((spec_path, os.path.join(dirname, f"{basename}.{fmt}"), state))
+
+        if outdir is not None and not os.path.exists(outdir):
+            os.makedirs(outdir)
+
+        # Set before the pool starts its workers, so that forked ones inherit it.
+        _PLOTTER = (state, self)
+
+        owned = not isinstance(executor, Executor)
+        executor = get_executor(executor, num_workers)
+
+        filenames = [None] * len(tasks)
+        try:
+            for i, filename in executor.map_unordered(_render_spec, tasks):
+                filenames[i] = filename
+        finally:
+            if owned:
+                executor.shutdown()
+            _PLOTTER = None
+
+        return filenames
+
+    def _get_state(self):
+        analyses = tuple((analysis.logdir, analysis.name) for analysis in self.analyses)
+        return (analyses, tuple(sorted(self.kwargs.items())))
+
+
+# The plotter of the running `render_specs` call and its state, inherited by forked workers.
+_PLOTTER = None
+
+
+def _get_plotter(state):
+    global _PLOTTER  # pylint: disable=global-statement
+
+    if _PLOTTER is None or _PLOTTER[0] != state:
+        analyses, kwargs = state
+        loaded = []
+        for logdir, name in analyses:
+            analysis = ExperimentAnalysis(logdir, name)
+            analysis.setup()
+            loaded.append(analysis)
+        _PLOTTER = (state, ExperimentPlotter(*loaded, **dict(kwargs)))
+
+    return _PLOTTER[1]
+
+
+def _render_spec(task):
+    spec_path, filename, state = task
+
+    if mp.current_process().name != "MainProcess":
+        plt.switch_backend("Agg")
+
+    plotter = _get_plotter(state)
+    fig = plotter.plot_chart_from_spec(spec_path, show_fig=False, filename=filename)
+    plt.close(fig)
+
+    return filename
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="tuneconfig-plot",
+        description="Renders the charts of JSON spec files of experiment analyses.")
+    parser.add_argument(
+        "specs", nargs="+",
+        help="JSON spec files with the arguments of ExperimentPlotter.plot")
+    parser.add_argument(
+        "--logdir", action="append", required=True,
+        help="experiment logdir (may be repeated)")
+    parser.add_argument(
+        "--name", action="append", default=[],
+        help="experiment name, in the order of --logdir")
+    parser.add_argument(
+        "--outdir", default=None,
+        help="output directory (default: the directory of each spec)")
+    parser.add_argument(
+        "--format", default="png",
+        help="output format, e.g. png or pdf")
+    parser.add_argument(
+        "--plot-type", default="line", choices=["line", "bar", "boxplot"],
+        help="default plot type of specs")
+    parser.add_argument(
+        "--num-workers", type=int, default=None,
+        help="number of worker processes")
+    args = parser.parse_args(argv)
+
+    plt.switch_backend("Agg")
+
+    names = args.name + [None] * (len(args.logdir) - len(args.name))
+    analyses = []
+    for logdir, name in zip(args.logdir, names):
+        analysis = ExperimentAnalysis(logdir, name)
+        analysis.setup()
+        analyses.append(analysis)
+
+    plotter = ExperimentPlotter(*analyses, plot_type=args.plot_type)
+    filenames = plotter.render_specs(
+        args.specs, outdir=args.outdir, fmt=args.format, num_workers=args.num_workers)
+
+    for filename in filenames:
+        print(filename)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import math
+
+import numpy as np
+
+
+# Joe & Kuo (2008) primitive polynomials and initial direction numbers
+# (degree s, coefficients a, initial numbers m) for dimensions 2 to 21.
+SOBOL_DIRECTION_NUMBERS = [
+    (1, 0, [1]),
+    (2, 1, [1, 3]),
+    (3, 1, [1, 3, 1]),
+    (3, 2, [1, 1, 1]),
+    (4, 1, [1, 1, 3, 3]),
+    (4, 4, [1, 3, 5, 13]),
+    (5, 2, [1, 1, 5, 5, 17]),
+    (5, 4, [1, 1, 5, 5, 5]),
+    (5, 7, [1, 1, 7, 11, 19]),
+    (5, 11, [1, 1, 5, 1, 1]),
+    (5, 13, [1, 1, 1, 3, 11]),
+    (5, 14, [1, 3, 5, 5, 31]),
+    (6, 1, [1, 3, 3, 9, 7, 49]),
+    (6, 13, [1, 1, 1, 15, 21, 21]),
+    (6, 16, [1, 3, 1, 13, 27, 49]),
+    (6, 19, [1, 1, 1, 15, 7, 5]),
+    (6, 22, [1, 3, 1, 15, 13, 25]),
+    (6, 25, [1, 1, 5, 5, 19, 61]),
+    (7, 1, [1, 3, 7, 11, 23, 15, 103]),
+    (7, 4, [1, 3, 7, 13, 13, 15, 69]),
+]
+
+SOBOL_BITS = 30
+
+
+class Distribution:
+    """Base class of the distributions of sampled parameters.
+
+    Subclasses map points of the unit interval to parameter values through
+    their (vectorized) inverse cumulative distribution function `ppf`.
+    """
+
+    def ppf(self, u):
+        raise NotImplementedError
+
+    def value(self, x):
+        return x.item()
+
+
+class Uniform(Distribution):
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+
+    def ppf(self, u):
+        return self.low + u * (self.high - self.low)
+
+
+class LogUniform(Distribution):
+    def __init__(self, low, high):
+        if low <= 0:
+            raise ValueError(f"Invalid loguniform lower bound '{low}'.")
+        self.low = low
+        self.high = high
+
+    def ppf(self, u):
+        low, high = math.log(self.low), math.log(self.high)
+        return np.exp(low + u * (high - low))
+
+
+class Choice(Distribution):
+    def __init__(self, values):
+        self.values = list(values)
+
+    def ppf(self, u):
+        n = len(self.values)
+        return np.minimum((u * n).astype(np.int64), n - 1)
+
+    def value(self, x):
+        return self.values[int(x)]
+
+
+def uniform(low, high):
+    return Uniform(low, high)
+
+
+def loguniform(low, high):
+    return LogUniform(low, high)
+
+
+def choice(values):
+    return Choice(values)
+
+
+class Sampler:
+    """Base class of the designs generating `n` points in the unit hypercube.
+
+    Without a `seed`, a concrete one is drawn from OS entropy once, so that
+    every space built from the same sampler (e.g., by `ConfigFactory.exclude`)
+    has the same points. Pass it to samplers on other hosts to reproduce them.
+    """
+
+    def __init__(self, n, seed=None):
+        self.n = n
+        self.seed = seed if seed is not None else np.random.SeedSequence().entropy
+
+    def sample(self, d):
+        raise NotImplementedError
+
+
+class RandomSampler(Sampler):
+    def sample(self, d):
+        rng = np.random.default_rng(self.seed)
+        return rng.random((self.n, d))
+
+
+class LatinHypercubeSampler(Sampler):
+    def sample(self, d):
+        rng = np.random.default_rng(self.seed)
+        strata = np.column_stack([rng.permutation(self.n) for _ in range(d)])
+        return (strata + rng.random((self.n, d))) / self.n
+
+
+class SobolSampler(Sampler):
+    def __init__(self, n, seed=None, scramble=True):
+        super().__init__(n, seed)
+        self.scramble = scramble
+
+    def sample(self, d):
+        max_dim = len(SOBOL_DIRECTION_NUMBERS) + 1
+        if d > max_dim:
+            raise ValueError(f"Sobol sampler supports at most {max_dim} dimensions.")
+
+        directions = self._direction_numbers(d)
+
+        # Points are enumerated in Gray code order, so that the i-th point
+        # XORs the direction numbers of the bits set in gray(i).
+        index = np.arange(self.n, dtype=np.int64)
+        gray = index ^ (index >> 1)
+        points = np.zeros((self.n, d), dtype=np.int64)
+        for bit in range(max(int(self.n).bit_length(), 1)):
+            mask = ((gray >> bit) & 1).astype(bool)
+            points[mask] ^= directions[bit]
+
+        if self.scramble:
+            rng = np.random.default_rng(self.seed)
+            points ^= rng.integers(0, 2 ** SOBOL_BITS, size=d)
+
+        return points / 2 ** SOBOL_BITS
+
+    @staticmethod
+    def _direction_numbers(d):
+        directions = np.zeros((SOBOL_BITS, d), dtype=np.int64)
+        directions[:, 0] = [1 << (SOBOL_BITS - k - 1) for k in range(SOBOL_BITS)]
+
+        for dim in range(1, d):
+            s, a, m = SOBOL_DIRECTION_NUMBERS[dim - 1]
+            v = [m[k] << (SOBOL_BITS - k - 1) for k in range(s)]
+            for k in range(s, SOBOL_BITS):
+                value = v[k - s] ^ (v[k - s] >> s)
+                for l in range(1, s):
+                    if (a >> (s - 1 - l)) & 1:
+                        value ^= v[k - l]
+                v.append(value)
+            directions[:, dim] = v
+
+        return directions
+
+
+def random_search(n, seed=None):
+    return RandomSampler(n, seed)
+
+
+def latin_hypercube(n, seed=None):
+    return LatinHypercubeSampler(n, seed)
+
+
+def sobol(n, seed=None, scramble=True):
+    return SobolSampler(n, seed, scramble)
+
+
+class SampledSpace:
+    """Fixed-size joint sample of a set of distributions.
+
+    The unit hypercube design of the `sampler` is drawn once and mapped
+    column-wise to each distribution. The i-th element is the tuple of
+    parameter values of the i-th sample.
+    """
+
+    def __init__(self, distributions, sampler):
+        self._distributions = distributions
+        self._sampler = sampler
+
+        u = sampler.sample(len(distributions))
+        self._columns = [
+            dist.ppf(u[:, k]) for k, dist in enumerate(distributions)
+        ]
+
+    def __len__(self):
+        return self._sampler.n
+
+    def __getitem__(self, i):
+        return tuple(
+            dist.value(column[i])
+            for dist, column in zip(self._distributions, self._columns)
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def find(self, k, value):
+        dist, column = self._distributions[k], self._columns[k]
+        if isinstance(dist, Choice):
+            matches = [j for j, val in enumerate(dist.values) if val == value]
+            return set(np.flatnonzero(np.isin(column, matches)).tolist())
+        return set(np.flatnonzero(column == value).tolist())
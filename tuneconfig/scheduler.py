@@ -0,0 +1,115 @@
+import collections
+import math
+
+
+class ASHAScheduler:
+    """Asynchronous successive halving (ASHA) scheduler.
+
+    Candidates start at the lowest rung of their bracket with the smallest
+    budget. Whenever a worker is free, the best `1 / reduction_factor`
+    fraction of the candidates that completed a rung is promoted to the next
+    rung (with `reduction_factor` times more budget), otherwise a new
+    candidate is started. With `brackets > 1` candidates are spread over
+    brackets with increasing minimum budgets (asynchronous Hyperband).
+
+    In `Experiment.run`, candidates are trials: all runs of a trial are
+    executed at each rung, from scratch in the same run directories (whose
+    result files are removed first), and the trial is ranked on the mean
+    score of its runs.
+
+    Args:
+        metric (str): (optional) key of the score if `exec_func` returns a dict.
+        mode (str): Either 'max' or 'min'.
+        min_budget (int): The budget of the lowest rung.
+        max_budget (int): The maximum budget of any rung.
+        reduction_factor (int): The promotion rate between rungs.
+        brackets (int): The number of Hyperband brackets.
+        budget_key (str): The config key of the budget given to `exec_func`.
+    """
+
+    def __init__(self,
+                 metric=None,
+                 mode="max",
+                 min_budget=1,
+                 max_budget=81,
+                 reduction_factor=3,
+                 brackets=1,
+                 budget_key="budget"):
+        # pylint: disable=too-many-arguments
+        if mode not in ["max", "min"]:
+            raise ValueError(f"Invalid scheduler mode '{mode}'.")
+
+        self.metric = metric
+        self.mode = mode
+        self.min_budget = min_budget
+        self.max_budget = max_budget
+        self.reduction_factor = reduction_factor
+        self.budget_key = budget_key
+
+        max_rung = int(math.log(max_budget / min_budget, reduction_factor) + 1e-9)
+        self.brackets = min(brackets, max_rung + 1)
+
+        self._budgets = [
+            [min_budget * reduction_factor ** k for k in range(s, max_rung + 1)]
+            for s in range(self.brackets)
+        ]
+
+        self.reset(0)
+
+    def reset(self, num_candidates):
+        self._pending = collections.deque(range(num_candidates))
+        self._rungs = [
+            [{} for _ in budgets]
+            for budgets in self._budgets
+        ]
+        self._promoted = [
+            [set() for _ in budgets]
+            for budgets in self._budgets
+        ]
+
+    def _bracket(self, candidate):
+        return candidate % self.brackets
+
+    def budget(self, candidate, rung):
+        return self._budgets[self._bracket(candidate)][rung]
+
+    def next_job(self):
+        """Returns the next (candidate, rung) to run, or None if there is none yet."""
+        for bracket in range(self.brackets):
+            job = self._get_promotable(bracket)
+            if job is not None:
+                return job
+
+        if self._pending:
+            return (self._pending.popleft(), 0)
+
+        return None
+
+    def _get_promotable(self, bracket):
+        rungs = self._rungs[bracket]
+        for rung in reversed(range(len(rungs) - 1)):
+            scores = rungs[rung]
+            num_promotable = len(scores) // self.reduction_factor
+            ranking = sorted(scores, key=scores.get, reverse=(self.mode == "max"))
+            for candidate in ranking[:num_promotable]:
+                if candidate not in self._promoted[bracket][rung]:
+                    self._promoted[bracket][rung].add(candidate)
+                    return (candidate, rung + 1)
+        return None
+
+    def score(self, result):
+        """Returns the score of a `result` of `exec_func`."""
+        return result[self.metric] if self.metric is not None else result
+
+    def report(self, candidate, rung, result):
+        """Records the `result` of `candidate` at `rung` and returns its score."""
+        return self.report_score(candidate, rung, self.score(result))
+
+    def report_score(self, candidate, rung, score):
+        """Records the `score` of `candidate` at `rung`, e.g., aggregated over runs."""
+        self._rungs[self._bracket(candidate)][rung][candidate] = score
+        return score
+
+    @property
+    def rungs(self):
+        return self._rungs
@@ -0,0 +1,152 @@
+import warnings
+
+import numpy as np
+
+
+BAND = ["center", "lower", "upper"]
+
+
+def nanmean(x, axis=0):
+    count = np.sum(~np.isnan(x), axis=axis)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.nansum(x, axis=axis) / count
+
+
+def nanquantile(x, q, axis=0):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanquantile(x, q, axis=axis)
+
+
+def iqm(x, axis=0):
+    """Interquartile mean: the mean of the values between the 25% and 75%
+    quantiles, trimming `int(n / 4)` values off each end (NaNs are ignored).
+    """
+    x = np.moveaxis(x, axis, 0)
+    count = np.sum(~np.isnan(x), axis=0)
+    trim = count // 4
+
+    # NaNs are sorted last, so that valid values are in positions [0, count).
+    x = np.sort(x, axis=0)
+    positions = np.arange(x.shape[0]).reshape((-1,) + (1,) * (x.ndim - 1))
+    mask = (positions >= trim) & (positions < count - trim)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(mask, x, 0.0).sum(axis=0) / mask.sum(axis=0)
+
+
+STATISTICS = {
+    "mean": nanmean,
+    "median": lambda x, axis=0: nanquantile(x, 0.5, axis=axis),
+    "iqm": iqm,
+}
+
+
+class Aggregator:
+    """Base class of the aggregators of the runs of a trial into a band.
+
+    Aggregators reduce a (runs, steps, metrics) array, where missing values
+    are NaNs, to the center, lower and upper (steps, metrics) arrays of the
+    band plotted around each curve.
+    """
+
+    def __call__(self, tensor):
+        raise NotImplementedError
+
+
+class StdBand(Aggregator):
+    """Mean plus or minus `k` standard deviations."""
+
+    def __init__(self, k=1.0):
+        self.k = k
+
+    def __call__(self, tensor):
+        mean = nanmean(tensor)
+        count = np.sum(~np.isnan(tensor), axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = np.nansum((tensor - mean) ** 2, axis=0) / (count - 1)
+        std = np.where(count > 1, np.sqrt(np.maximum(var, 0.0)), np.nan)
+        return mean, mean - self.k * std, mean + self.k * std
+
+
+class MinMaxBand(Aggregator):
+    """Mean between the minimum and maximum values."""
+
+    def __call__(self, tensor):
+        return nanmean(tensor), np.fmin.reduce(tensor, axis=0), np.fmax.reduce(tensor, axis=0)
+
+
+class QuantileBand(Aggregator):
+    """Median (or `center` quantile) between the `lower` and `upper` quantiles."""
+
+    def __init__(self, lower=0.25, upper=0.75, center=0.5):
+        self.quantiles = [center, lower, upper]
+
+    def __call__(self, tensor):
+        center, lower, upper = nanquantile(tensor, self.quantiles)
+        return center, lower, upper
+
+
+class BootstrapCI(Aggregator):
+    """Percentile bootstrap confidence interval of a `statistic` of the runs.
+
+    All resamples of the runs are drawn at once with a seeded generator,
+    and the statistic is computed for all of them in a single batched
+    array operation (over chunks of steps to bound memory).
+
+    Args:
+        statistic (str): One of 'mean', 'median' or 'iqm'.
+        confidence (float): The confidence level of the interval.
+        num_resamples (int): The number of bootstrap resamples.
+        seed (int): The seed of the random generator.
+        max_elements (int): The maximum size of the resampled array per chunk of steps.
+    """
+
+    def __init__(self, statistic="mean", confidence=0.95, num_resamples=1000, seed=0, max_elements=2 ** 24):
+        # pylint: disable=too-many-arguments
+        if statistic not in STATISTICS:
+            raise ValueError(f"Invalid bootstrap statistic '{statistic}'.")
+        self.statistic = statistic
+        self.confidence = confidence
+        self.num_resamples = num_resamples
+        self.seed = seed
+        self.max_elements = max_elements
+
+    def __call__(self, tensor):
+        statistic = STATISTICS[self.statistic]
+        num_runs, num_steps, num_metrics = tensor.shape
+
+        rng = np.random.default_rng(self.seed)
+        resamples = rng.integers(0, num_runs, size=(self.num_resamples, num_runs))
+
+        alpha = (1.0 - self.confidence) / 2
+        lower = np.empty((num_steps, num_metrics))
+        upper = np.empty((num_steps, num_metrics))
+
+        chunksize = max(1, self.max_elements // max(1, self.num_resamples * num_runs * num_metrics))
+        for start in range(0, num_steps, chunksize):
+            chunk = tensor[:, start:start + chunksize]
+            samples = statistic(chunk[resamples], axis=1)
+            lower[start:start + chunksize], upper[start:start + chunksize] = nanquantile(
+                samples, [alpha, 1.0 - alpha])
+
+        return statistic(tensor, axis=0), lower, upper
+
+
+AGGREGATORS = {
+    "std": StdBand(),
+    "minmax": MinMaxBand(),
+    "iqr": QuantileBand(0.25, 0.75),
+    "ci": BootstrapCI("mean"),
+    "median": BootstrapCI("median"),
+    "iqm": BootstrapCI("iqm"),
+}
+
+
+def get_aggregator(aggregator):
+    """Returns the `aggregator` instance or the registered aggregator with the given name."""
+    if isinstance(aggregator, Aggregator):
+        return aggregator
+    if aggregator not in AGGREGATORS:
+        raise ValueError(f"Invalid aggregator '{aggregator}'.")
+    return AGGREGATORS[aggregator]
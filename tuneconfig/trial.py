@@ -1,27 +1,391 @@
-from collections import defaultdict
+from collections.abc import Mapping
+import csv
+import io
 import json
 import os
+import time
+import uuid
+import warnings
 
 import numpy as np
 import pandas as pd
 
+from tuneconfig import columnar
+from tuneconfig.cache import LRUCache
 from tuneconfig.experiment import Experiment
+from tuneconfig.stats import BAND, get_aggregator
+
+
+class ResultFile:
+    """Lazy handle of a run result CSV file.
+
+    The header is read on first access to `columns`, and the data on first
+    call to `load`. The first parse of the CSV file writes a columnar
+    sidecar next to it (see `tuneconfig.columnar`), from which only the
+    requested columns are read afterwards, until the CSV file changes.
+
+    The handle keeps the byte offset of the last complete row it parsed,
+    so that `refresh` only parses rows appended to the file since then.
+    Appended rows are kept as chunks and concatenated on the next `load`.
+
+    Args:
+        filepath (str): The path of the CSV file.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._columns = None
+        self._data = {}
+        self._chunks = []
+        self._offset = None
+
+    @property
+    def columns(self):
+        if self._columns is None:
+            with open(self.filepath, "r", newline="") as file:
+                self._columns = next(csv.reader(file), [])
+        return self._columns
+
+    @property
+    def offset(self):
+        return self._offset
+
+    @property
+    def num_rows(self):
+        num_rows = len(next(iter(self._data.values()))) if self._data else 0
+        return num_rows + sum(len(chunk) for chunk in self._chunks)
+
+    def load(self, usecols=None):
+        """
+        Returns the DataFrame with the given columns (all columns by default).
+
+        Args:
+            usecols (List[str]): (optional) The columns to read.
+        """
+        usecols = self.columns if usecols is None else list(usecols)
+        self._concat_chunks()
+
+        missing = [col for col in usecols if col not in self._data]
+        if missing:
+            df, offset = self._read(missing)
+            self.update(df, offset)
+
+        return pd.DataFrame({col: self._data[col] for col in usecols}, columns=usecols)
+
+    def refresh(self):
+        """
+        Parses the rows appended to the file since the last load.
+
+        Only columns loaded so far are updated. If the file was truncated or
+        replaced by a smaller one, cached data is dropped and loaded again
+        on the next access.
+
+        Returns:
+            int: The number of new rows, or -1 if cached data was dropped.
+        """
+        if self._offset is None:
+            return 0
+
+        size = os.stat(self.filepath).st_size
+        if size < self._offset:
+            self._columns = None
+            self._data = {}
+            self._chunks = []
+            self._offset = None
+            return -1
+
+        if size == self._offset:
+            return 0
+
+        num_rows = self.num_rows
+        df, self._offset = self._read_csv(self._offset)
+        df.index = pd.RangeIndex(num_rows, num_rows + len(df))
+        if len(df) > 0:
+            self._chunks.append(df[list(self._data)])
+
+        return len(df)
+
+    def _concat_chunks(self):
+        if not self._chunks:
+            return
+        for col in self._data:
+            self._data[col] = pd.concat([self._data[col], *(chunk[col] for chunk in self._chunks)])
+        self._chunks = []
+
+    @property
+    def is_loaded(self):
+        return all(col in self._data for col in self.columns)
+
+    def iter_chunks(self, usecols=None, chunksize=100000):
+        """Yields the rows of the file in DataFrames of `chunksize` rows, without caching them."""
+        reader = pd.read_csv(self.filepath, usecols=usecols, chunksize=chunksize)
+        try:
+            yield from reader
+        finally:
+            reader.close()
+
+    def update(self, df, offset):
+        """Caches the columns of `df` parsed up to byte `offset`, e.g. by another process."""
+        self._concat_chunks()
+        self._data.update(df.items())
+        self._offset = offset
+
+    def restore(self, offset):
+        """
+        Caches all columns from the sidecar of the file if it was written up
+        to byte `offset`, e.g. by `read_result` in another process.
+
+        Returns:
+            bool: Whether the columns were cached.
+        """
+        df, size = columnar.read(self.filepath)
+        if df is None or size != offset:
+            return False
+        self.update(df, offset)
+        return True
+
+    def _read(self, columns):
+        if self._offset is None:
+            df, size = columnar.read(self.filepath, columns)
+            if df is not None:
+                return df, size
+
+            source = columnar.get_source(self.filepath)
+            df, offset = self._read_csv()
+            if offset == source[1]:
+                columnar.write(self.filepath, df, source)
+            return df, offset
+
+        # Columns loaded later must have the same rows as cached ones.
+        df, size = columnar.read(self.filepath, columns)
+        if df is not None and size == self._offset:
+            return df, size
+        return self._read_csv(0, self._offset)
+
+    def _read_csv(self, start=0, end=None):
+        with open(self.filepath, "rb") as file:
+            file.seek(start)
+            data = file.read() if end is None else file.read(end - start)
+
+        # A partially written last line is left for the next refresh.
+        data = data[:data.rfind(b"\n") + 1]
+        offset = start + len(data)
+
+        if not data:
+            return pd.DataFrame(columns=self.columns, dtype=float), offset
+        if start == 0:
+            return pd.read_csv(io.BytesIO(data)), offset
+        return pd.read_csv(io.BytesIO(data), header=None, names=self.columns), offset
+
+
+def read_result(filepath):
+    """
+    Parses the CSV file in `filepath`, which writes its sidecar, e.g. in a worker process.
+
+    Returns:
+        Tuple[str, int]: The filepath and the byte offset of the last complete row parsed.
+    """
+    file = ResultFile(filepath)
+    file.load()
+    return filepath, file.offset
+
+
+class FrameFile:
+    """In-memory stand-in of a ResultFile, e.g., for runs given as DataFrames.
+
+    Args:
+        df (pd.DataFrame): The results.
+    """
+
+    filepath = None
+
+    def __init__(self, df):
+        self._df = df
+
+    @property
+    def columns(self):
+        return list(self._df.columns)
+
+    @property
+    def num_rows(self):
+        return len(self._df)
+
+    @property
+    def is_loaded(self):
+        return True
+
+    def load(self, usecols=None):
+        if usecols is None:
+            return self._df
+        return self._df[list(usecols)]
+
+    def refresh(self):
+        return 0
+
+    def iter_chunks(self, usecols=None, chunksize=100000):
+        df = self.load(usecols)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+
+
+class RunResults(Mapping):
+    """Mapping of result names to the DataFrames of a run, loaded on access.
+
+    Args:
+        files (Dict[str, ResultFile]): The result files indexed by result name.
+    """
+
+    def __init__(self, files):
+        self._files = files
+
+    @classmethod
+    def wrap(cls, results):
+        """Returns `results`, or the RunResults of a dict of DataFrames or files."""
+        if isinstance(results, RunResults):
+            return results
+        return RunResults({
+            result: FrameFile(value) if isinstance(value, pd.DataFrame) else value
+            for result, value in results.items()
+        })
+
+    def file(self, result):
+        return self._files[result]
+
+    def add_file(self, result, file):
+        self._files[result] = file
+
+    def __getitem__(self, result):
+        return self._files[result].load()
+
+    def __iter__(self):
+        return iter(self._files)
+
+    def __len__(self):
+        return len(self._files)
 
 
 class Trial:
+    """Trial
+
+    Data, stats and tensors are memoized in an LRU `cache`, which may be
+    shared with other trials (e.g., by ExperimentAnalysis) to bound their
+    total memory. Values of the trial are dropped when runs are added.
+    Runs may be given as RunResults or as dicts of DataFrames.
+    """
 
-    def __init__(self, logdir, config, runs):
+    STATS = ["min", "max", "mean", "std"]
+
+    CACHE_MAX_BYTES = 256 * 2 ** 20
+
+    # The number of seconds after which the listing of a run directory is
+    # reused until the directory changes, see `_list_results`.
+    LISTING_MIN_AGE = 2.0
+
+    def __init__(self, logdir, config, runs, signatures=None, cache=None):
+        # pylint: disable=too-many-arguments
         self.logdir = logdir
         self.config = config
-        self.runs = runs
+        self.runs = {run_dir: RunResults.wrap(results) for run_dir, results in runs.items()}
+        self.signatures = signatures or {}
+
+        self._cache = cache if cache is not None else LRUCache(self.CACHE_MAX_BYTES)
+        self._cache_id = uuid.uuid4().hex
+        self._listings = {}
+
+    def add_run(self, run_dir, results):
+        """
+        Adds (or replaces) the `results` of `run_dir` and clears the cached values of the trial.
+
+        Args:
+            run_dir (str): The run directory.
+            results (Union[RunResults, Dict[str, pd.DataFrame]]): The results of the run.
+        """
+        self.runs[run_dir] = RunResults.wrap(results)
+        self.invalidate()
+
+    def refresh(self, run_dirs=None):
+        """
+        Picks up new runs and result files, and rows appended to loaded ones.
+
+        Only run directories whose files changed (by modification time and
+        size) are inspected, and only appended rows are parsed. Run
+        directories are only listed again when files were added or removed.
+
+        Args:
+            run_dirs (List[str]): (optional) The run directories, listed from the trial logdir if not given.
+
+        Returns:
+            bool: Whether anything changed.
+        """
+        if run_dirs is None:
+            run_dirs = Experiment.get_run_dirs(self.logdir)
+
+        changed = False
+        for run_dir in run_dirs:
+            try:
+                filenames = self._list_results(run_dir)
+            except FileNotFoundError:
+                continue
+
+            signature = self._get_signature(run_dir, filenames)
+            if self.signatures.get(run_dir) == signature:
+                continue
+
+            self.signatures[run_dir] = signature
+            changed = True
+
+            if run_dir not in self.runs:
+                if filenames:
+                    self.runs[run_dir] = RunResults({})
+                else:
+                    continue
+
+            results = self.runs[run_dir]
+            for path in filenames:
+                result = os.path.splitext(path)[0]
+                if result in results:
+                    results.file(result).refresh()
+                else:
+                    results.add_file(result, ResultFile(os.path.join(run_dir, path)))
+
+        if changed:
+            self.invalidate()
+
+        return changed
+
+    def _list_results(self, run_dir):
+        # The listing is reused while the modification time of the directory
+        # is unchanged, but only once that time is old enough that files
+        # created within the same tick of a coarse (e.g., NFS) clock are listed.
+        stat = os.stat(run_dir)
+        listing = self._listings.get(run_dir)
+        if listing is not None and listing[0] == stat.st_mtime_ns:
+            return listing[1]
+
+        filenames = [path for path in os.listdir(run_dir) if path.endswith(".csv")]
+        if time.time() - stat.st_mtime > self.LISTING_MIN_AGE:
+            self._listings[run_dir] = (stat.st_mtime_ns, filenames)
+        return filenames
+
+    def memoize(self, key, fn):
+        """Returns the cached value of `key`, calling `fn()` to compute it if missing."""
+        return self._cache.get_or_compute((self._cache_id, *key), fn)
+
+    def invalidate(self):
+        self._cache.clear(self._cache_id)
 
     @property
     def results(self):
+        # Trials that are still running (or failed) may have no runs yet.
+        if not self.runs:
+            return []
         return sorted(self[0])
 
     @property
     def metrics(self):
-        return {result: sorted(df.columns) for result, df in self[0].items()}
+        if not self.runs:
+            return {}
+        return {result: sorted(self[0].file(result).columns) for result in self[0]}
 
     def info(self):
         print(f"<{self}>")
@@ -46,28 +410,195 @@ class Trial:
             for result in self.results
         }
 
-    def get_data(self, result, transform=None):
+    def get_data(self, result, transform=None, metric=None):
+        key = ("data", result, transform, metric)
+        return self.memoize(
+            key, lambda: self._load_data(result, transform, metric))
+
+    def _load_data(self, result, transform, metric):
+        usecols = None if metric is None else [metric]
         data = []
         for results in self.runs.values():
-            df = results[result]
+            df = results.file(result).load(usecols)
             values = self._transform_metric(df, transform)
             data.append(values)
         return data
 
-    def get_all_stats(self, transform=None):
-        stats = defaultdict(pd.DataFrame)
-        for results in self.runs.values():
-            for result in results:
-                result_stats = self.get_stats(result, transform)
-                stats[result] = stats[result].append(
-                    result_stats, ignore_index=True)
-        return stats
-
-    def get_stats(self, result, transform=None):
-        data = self.get_data(result, transform)
-        df = pd.concat(data)
-        df = df.groupby(df.index, sort=False)
-        return df.agg(["min", "max", "mean", "std"])
+    def get_tensor(self, result, metric=None):
+        """
+        Returns the values of `result` in all runs as a dense array.
+
+        Runs with fewer steps than the longest one are padded with NaNs.
+
+        Args:
+            result (str): The result name.
+            metric (str): (optional) The only metric to read.
+
+        Returns:
+            Tuple[np.ndarray, List[str]]: The (runs, steps, metrics) array and the metric names.
+        """
+        tensor, columns, _ = self._get_stacked(result, metric)
+        return tensor, columns
+
+    def _get_stacked(self, result, metric=None):
+        key = ("tensor", result, metric)
+        return self.memoize(
+            key, lambda: self._stack(self.get_data(result, metric=metric)))
+
+    def get_all_stats(self, transform=None, quantiles=None):
+        return {
+            result: self.get_stats(result, transform, quantiles=quantiles)
+            for result in self.results
+        }
+
+    def get_stats(self, result, transform=None, metric=None, quantiles=None):
+        """
+        Returns the statistics of `result` across runs.
+
+        Without `transform`, stats are computed at every step and indexed by
+        step, with (metric, stat) columns. If `transform` reduces each run to
+        a Series (e.g., 'mean'), stats are indexed by metric instead.
+
+        Args:
+            result (str): The result name.
+            transform (str): (optional) The name of a DataFrame method applied to each run.
+            metric (str): (optional) The only metric to read.
+            quantiles (List[float]): (optional) Quantiles added to the min/max/mean/std stats.
+        """
+        quantiles = tuple(quantiles) if quantiles else None
+        key = ("stats", result, transform, metric, quantiles)
+        return self.memoize(
+            key, lambda: self._compute_stats(result, transform, metric, quantiles))
+
+    def _compute_stats(self, result, transform, metric, quantiles):
+        if transform is None:
+            tensor, columns, index = self._get_stacked(result, metric)
+        else:
+            data = self.get_data(result, transform, metric)
+            if all(isinstance(values, pd.Series) for values in data):
+                frame = pd.concat(data, axis=1, sort=False).T
+                stats, names = self._reduce(frame.to_numpy(dtype=float), quantiles)
+                return pd.DataFrame(
+                    np.stack(stats, axis=-1), index=frame.columns, columns=names)
+            tensor, columns, index = self._stack(data)
+
+        return self._to_stats_frame(tensor, columns, index, quantiles)
+
+    def get_band(self, result, aggregator="std", transform=None, metric=None):
+        """
+        Returns the band aggregating `result` across runs.
+
+        Columns are (metric, 'center'/'lower'/'upper') and rows are indexed
+        by step, or by metric if `transform` reduces each run to a Series.
+
+        Args:
+            result (str): The result name.
+            aggregator (Union[str, Aggregator]): The name of a registered aggregator
+                (see `tuneconfig.stats.AGGREGATORS`) or an instance.
+            transform (str): (optional) The name of a DataFrame method applied to each run.
+            metric (str): (optional) The only metric to read.
+        """
+        key = ("band", result, aggregator, transform, metric)
+        return self.memoize(
+            key, lambda: self._compute_band(result, get_aggregator(aggregator), transform, metric))
+
+    def _compute_band(self, result, aggregator, transform, metric):
+        if transform is None:
+            tensor, columns, index = self._get_stacked(result, metric)
+        else:
+            data = self.get_data(result, transform, metric)
+            if all(isinstance(values, pd.Series) for values in data):
+                frame = pd.concat(data, axis=1, sort=False).T
+                tensor = frame.to_numpy(dtype=float)[:, None, :]
+                band = aggregator(tensor)
+                return pd.DataFrame(
+                    np.stack([values[0] for values in band], axis=-1),
+                    index=frame.columns, columns=BAND)
+            tensor, columns, index = self._stack(data)
+
+        band = aggregator(tensor)
+        return pd.DataFrame(
+            np.stack(band, axis=-1).reshape(tensor.shape[1], -1),
+            index=index,
+            columns=pd.MultiIndex.from_product([columns, BAND]))
+
+    def iter_stats(self, result, metric=None, chunksize=100000, quantiles=None):
+        """
+        Yields the statistics of `get_stats` in chunks of `chunksize` steps.
+
+        The result files of all runs are read in lockstep, one chunk of
+        steps at a time, so that memory is bounded by `chunksize` times the
+        number of runs rather than by the size of the files. Since stats
+        are computed across runs at each step, they are exact.
+
+        Args:
+            result (str): The result name.
+            metric (str): (optional) The only metric to read.
+            chunksize (int): The number of steps per chunk.
+            quantiles (List[float]): (optional) Quantiles added to the min/max/mean/std stats.
+        """
+        usecols = None if metric is None else [metric]
+        readers = [
+            results.file(result).iter_chunks(usecols, chunksize)
+            for results in self.runs.values()
+        ]
+
+        try:
+            while True:
+                frames = [next(reader, None) for reader in readers]
+                frames = [df for df in frames if df is not None]
+                if not frames:
+                    break
+
+                tensor, columns, index = self._stack(frames)
+                yield self._to_stats_frame(tensor, columns, index, quantiles)
+        finally:
+            for reader in readers:
+                reader.close()
+
+    @classmethod
+    def _to_stats_frame(cls, tensor, columns, index, quantiles=None):
+        stats, names = cls._reduce(tensor, quantiles)
+        return pd.DataFrame(
+            np.stack(stats, axis=-1).reshape(tensor.shape[1], -1),
+            index=index,
+            columns=pd.MultiIndex.from_product([columns, names]))
+
+    @staticmethod
+    def _stack(frames):
+        columns = list(dict.fromkeys(col for df in frames for col in df.columns))
+        index = max((df.index for df in frames), key=len)
+
+        tensor = np.full((len(frames), len(index), len(columns)), np.nan)
+        for k, df in enumerate(frames):
+            tensor[k, :len(df)] = df.reindex(columns=columns).to_numpy(dtype=float)
+
+        return tensor, columns, index
+
+    @classmethod
+    def _reduce(cls, tensor, quantiles=None):
+        # Stats are reduced over runs (axis 0), ignoring the NaN padding.
+        count = np.sum(~np.isnan(tensor), axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nansum(tensor, axis=0) / count
+            sq_dev = np.nansum((tensor - mean) ** 2, axis=0)
+            std = np.where(count > 1, np.sqrt(sq_dev / np.maximum(count - 1, 1)), np.nan)
+
+        stats = [
+            np.fmin.reduce(tensor, axis=0),
+            np.fmax.reduce(tensor, axis=0),
+            mean,
+            std,
+        ]
+        names = list(cls.STATS)
+
+        if quantiles:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                stats.extend(np.nanquantile(tensor, quantiles, axis=0))
+            names.extend(f"q{q * 100:g}" for q in quantiles)
+
+        return stats, names
 
     @staticmethod
     def _transform_metric(df, transform):
@@ -81,22 +612,63 @@ class Trial:
         return rslt
 
     @classmethod
-    def from_directory(cls, dirname):
+    def from_directory(cls, dirname, config=None, run_dirs=None, previous=None, cache=None):
+        # pylint: disable=too-many-arguments
+        """
+        Loads the trial in `dirname`.
+
+        Args:
+            dirname (str): The trial directory.
+            config (dict): (optional) The trial config, read from `config.json` if not given.
+            run_dirs (List[str]): (optional) The run directories, listed from `dirname` if not given.
+            previous (Trial): (optional) A previously loaded version of the trial
+                whose config and runs are reused if their files are unchanged.
+            cache (LRUCache): (optional) The cache shared with other trials.
+        """
+        signatures = {}
+
         # config
-        with open(os.path.join(dirname, "config.json"), "r") as file:
-            config = json.load(file)
+        if config is None:
+            signatures[dirname] = cls._get_signature(dirname, [Experiment.CONFIG_FILE])
+            if previous is not None and previous.signatures.get(dirname) == signatures[dirname]:
+                config = previous.config
+            else:
+                with open(os.path.join(dirname, Experiment.CONFIG_FILE), "r") as file:
+                    config = json.load(file)
 
         # runs
-        runs = defaultdict(dict)
-        for run_dir in Experiment.get_run_dirs(dirname):
-            for path in os.listdir(run_dir):
-                basename, extension = os.path.splitext(path)
-                if extension == ".csv":
-                    filepath = os.path.join(run_dir, path)
-                    df = pd.read_csv(filepath)
-                    runs[run_dir][basename] = df
-
-        return Trial(dirname, config, runs)
+        if run_dirs is None:
+            run_dirs = Experiment.get_run_dirs(dirname)
+
+        runs = {}
+        for run_dir in run_dirs:
+            # Run directories listed in the manifest may have been deleted.
+            if not os.path.isdir(run_dir):
+                continue
+
+            filenames = [path for path in os.listdir(run_dir) if path.endswith(".csv")]
+            signatures[run_dir] = cls._get_signature(run_dir, filenames)
+
+            if previous is not None and previous.signatures.get(run_dir) == signatures[run_dir]:
+                if run_dir in previous.runs:
+                    runs[run_dir] = previous.runs[run_dir]
+                continue
+
+            if filenames:
+                runs[run_dir] = RunResults({
+                    os.path.splitext(path)[0]: ResultFile(os.path.join(run_dir, path))
+                    for path in filenames
+                })
+
+        return Trial(dirname, config, runs, signatures, cache)
+
+    @staticmethod
+    def _get_signature(dirname, filenames):
+        signature = {}
+        for path in sorted(filenames):
+            stat = os.stat(os.path.join(dirname, path))
+            signature[path] = (stat.st_mtime_ns, stat.st_size)
+        return signature
 
     def __str__(self):
         return f"Trial(logdir={self.logdir})"